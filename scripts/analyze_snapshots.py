@@ -4,10 +4,43 @@
 from __future__ import annotations
 
 import argparse
+import heapq
+import io
 import json
-from collections import Counter, defaultdict
+import multiprocessing
+import os
+import platform
+import sys
+from collections import defaultdict
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Final, Iterable, Iterator, List, Tuple
+
+_json = json
+if platform.python_implementation() == "CPython":
+    # JSONL の解析はここが律速になるため、高速なデコーダがあれば優先する。
+    # PyPy では C 拡張経由より標準 json の方が JIT が効くため切り替えない。
+    try:
+        import orjson as _json
+    except ImportError:  # pragma: no cover - optional dependency
+        try:
+            import ujson as _json
+        except ImportError:
+            pass
+
+try:  # 巨大なスナップショット行は必要なパスだけをストリーミングで射影する
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+# 純 Python のバックエンドでは全イベントをたどる方が 1 回の loads より遅いため、C バックエンドのときだけ射影する
+_C_IJSON_BACKENDS: Final = frozenset({"yajl2_c", "yajl2_cffi"})
+USE_PROJECTION: Final = ijson is not None and getattr(ijson, "backend", None) in _C_IJSON_BACKENDS
+
+READ_CHUNK_SIZE: Final = 1 << 20
+PROJECTION_THRESHOLD: Final = 256 * 1024
+_REWARD_PREFIXES: Final[Dict[str, str]] = {"reward.external": "external", "reward.internal": "internal"}
+_EMPTY: Final[Dict[str, Any]] = {}
 
 
 def parse_args() -> argparse.Namespace:
@@ -23,6 +56,12 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="プレイブック更新対象の上位N件を表示 (default: 5)。",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="ファイル単位で並列解析するプロセス数。1 で逐次実行 (default: CPU数の半分)。",
+    )
     return parser.parse_args()
 
 
@@ -35,46 +74,145 @@ def collect_files(paths: List[str]) -> List[Path]:
         if path.is_file():
             files.append(path)
         else:
-            files.extend(sorted(path.rglob("*.jsonl")))
+            found: List[Path] = []
+            for root, _dirs, names in os.walk(path):
+                for name in names:
+                    if name.endswith(".jsonl"):
+                        found.append(Path(root, name))
+            found.sort()
+            files.extend(found)
     return files
 
 
-def analyse_files(files: Iterable[Path], top_targets: int) -> Dict[str, Any]:
-    episodes = 0
-    ticks = 0
-    total_reward = 0.0
-    playbook_counter = Counter()
-    stats_history: List[Dict[str, Any]] = []
-
-    for file_path in files:
-        episode_ticks = 0
-        episode_reward = 0.0
-        with file_path.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                data = json.loads(line)
-                episode_ticks += 1
-                snapshot_reward = data.get("reward", {}).get("external", 0.0) + data.get("reward", {}).get("internal", 0.0)
-                episode_reward += snapshot_reward
-                for update in data.get("playbook_updates", []):
-                    playbook_counter.update([update.get("target", "unknown")])
-                stats = data.get("playbook_stats")
-                if stats:
-                    stats_history.append(stats)
+def iter_jsonl_lines(path: Path, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield non-empty raw lines of a JSONL file, reading it in large binary chunks."""
+    tail = b""
+    with path.open("rb", buffering=chunk_size) as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                if line.endswith(b"\r"):
+                    line = line[:-1]
+                if line:
+                    yield line
+    if tail.endswith(b"\r"):
+        tail = tail[:-1]
+    if tail:
+        yield tail
+
+
+def load_projected(line: bytes) -> Dict[str, Any]:
+    """Decode only reward / playbook_updates[*].target / playbook_stats from a snapshot line.
+
+    observation や action_plan などの不要なサブツリーは Python オブジェクト化しない。
+    ijson が必要。
+    """
+    reward: Dict[str, float] = {}
+    updates: List[Dict[str, Any]] = []
+    stats_builder = None
+    for prefix, event, value in ijson.parse(io.BytesIO(line), use_float=True):
+        if prefix in _REWARD_PREFIXES:
+            reward[_REWARD_PREFIXES[prefix]] = value
+        elif prefix == "playbook_updates.item":
+            if event == "start_map":
+                updates.append({})
+        elif prefix == "playbook_updates.item.target":
+            updates[-1]["target"] = value
+        elif prefix == "playbook_stats" or prefix.startswith("playbook_stats."):
+            if stats_builder is None:
+                stats_builder = ijson.ObjectBuilder()
+            stats_builder.event(event, value)
+    return {
+        "reward": reward,
+        "playbook_updates": updates,
+        "playbook_stats": stats_builder.value if stats_builder is not None else None,
+    }
+
+
+def _analyse_one(file_path: Path) -> Tuple[int, float, Dict[str, int], Dict[str, Any]]:
+    """Parse a single episode log into (ticks, total reward, target counts, latest stats)."""
+    episode_ticks: int = 0
+    episode_reward: float = 0.0
+    playbook_counts: Dict[str, int] = defaultdict(int)
+    latest_stats: Dict[str, Any] = {}
+    line: bytes
+    data: Dict[str, Any]
+    for line in iter_jsonl_lines(file_path):
+        if line.isspace():
+            continue
+        if USE_PROJECTION and len(line) > PROJECTION_THRESHOLD:
+            data = load_projected(line)
+        else:
+            data = _json.loads(line)
+        episode_ticks += 1
+        reward: Dict[str, float] = data.get("reward") or _EMPTY
+        snapshot_reward: float = reward.get("external", 0.0) + reward.get("internal", 0.0)
+        episode_reward += snapshot_reward
+        updates = data.get("playbook_updates")
+        if updates:
+            for update in updates:
+                playbook_counts[update.get("target", "unknown")] += 1
+        stats = data.get("playbook_stats")
+        if stats:
+            latest_stats = stats
+    return episode_ticks, episode_reward, dict(playbook_counts), latest_stats
+
+
+def _analyse_indexed(item: Tuple[int, Path]) -> Tuple[int, Tuple[int, float, Dict[str, int], Dict[str, Any]]]:
+    index, file_path = item
+    return index, _analyse_one(file_path)
+
+
+def analyse_files(
+    files: Iterable[Path],
+    top_targets: int,
+    jobs: int = 1,
+    progress: bool = False,
+) -> Dict[str, Any]:
+    episodes: int = 0
+    ticks: int = 0
+    total_reward: float = 0.0
+    playbook_counts: Dict[str, int] = defaultdict(int)
+    latest_stats: Dict[str, Any] = {}
+
+    files = list(files)
+    if len(files) > 1 and jobs > 1:
+        # ファイル単位で独立しているため、jobs > 1 なら複数ファイルをプロセスプールで並列に解析する。
+        # 完了順に受け取り、マージはファイル順に並べ直してから行う（結果を決定的に保つ）。
+        results: List[Any] = [None] * len(files)
+        with multiprocessing.Pool(jobs) as pool:
+            for done, (index, result) in enumerate(
+                pool.imap_unordered(_analyse_indexed, enumerate(files), chunksize=8), start=1
+            ):
+                results[index] = result
+                if progress:
+                    print(f"[{done}/{len(files)}] {files[index]}", file=sys.stderr)
+    else:
+        results = [_analyse_one(file_path) for file_path in files]
+
+    for episode_ticks, episode_reward, file_counts, file_stats in results:
+        if file_stats:
+            latest_stats = file_stats
         if episode_ticks == 0:
             continue
         episodes += 1
         ticks += episode_ticks
         total_reward += episode_reward
+        for target, count in file_counts.items():
+            playbook_counts[target] += count
 
     aggregated_stats = {
         "episodes": episodes,
         "average_ticks": ticks / episodes if episodes else 0,
         "average_total_reward": total_reward / episodes if episodes else 0.0,
-        "playbook_top_targets": playbook_counter.most_common(top_targets) if episodes else [],
-        "playbook_stats_latest": stats_history[-1] if stats_history else {},
+        "playbook_top_targets": (
+            heapq.nlargest(top_targets, playbook_counts.items(), key=itemgetter(1)) if episodes else []
+        ),
+        "playbook_stats_latest": latest_stats,
     }
     return aggregated_stats
 
@@ -85,7 +223,7 @@ def main():
     if not files:
         print("対象となるJSONLファイルが見つかりませんでした。")
         return
-    report = analyse_files(files, args.top_playbook_targets)
+    report = analyse_files(files, args.top_playbook_targets, jobs=args.jobs, progress=args.jobs > 1)
     print(json.dumps(report, ensure_ascii=False, indent=2))
 
 
@@ -7,12 +7,12 @@ import argparse
 import json
 import logging
 import time
-from dataclasses import asdict
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from yamada7.config import ACEConfig, DEFAULT_CONFIG, LLMConfig, LoopConfig
+from yamada7.core import jsonio
 from yamada7.core import (
     ExecutionEngine,
     FeedbackLoop,
@@ -21,19 +21,15 @@ from yamada7.core import (
     RewardSynthesizer,
     StateFormatter,
     LoopSnapshot,
-    ExecutionEvent,
 )
 from yamada7.env import GridWorldEnvironment
-from yamada7.llm import ClaudeCodeClient, LLMThinker
-
-try:
-    from yamada7.ace import ACECurator, ACEReflector, PlaybookStore
-except ImportError:  # pragma: no cover - fallback when ACE is not installed
-    ACECurator = ACEReflector = PlaybookStore = None
+from yamada7.llm import LLMThinker
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger("yamada7.runner")
 
+SNAPSHOT_WRITE_BATCH = 256
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run yamada7 survival loop")
@@ -46,9 +42,18 @@ def build_parser() -> argparse.ArgumentParser:
         default="heuristic",
         help="LLM planner mode. 'claude-cli' は Claude Code CLI を呼び出す。",
     )
-    parser.add_argument("--claude-binary", default=None, help="Claude Code CLI バイナリパス (例: claude)")
-    parser.add_argument("--claude-model", default=None, help="Claude Code モデル名")
-    parser.add_argument("--claude-timeout", type=int, default=None, help="Claude CLI タイムアウト秒数")
+    parser.add_argument(
+        "--claude-binary",
+        default=DEFAULT_CONFIG.llm.claude_binary,
+        help="Claude Code CLI バイナリパス (例: claude)",
+    )
+    parser.add_argument("--claude-model", default=DEFAULT_CONFIG.llm.claude_model, help="Claude Code モデル名")
+    parser.add_argument(
+        "--claude-timeout",
+        type=int,
+        default=DEFAULT_CONFIG.llm.claude_timeout,
+        help="Claude CLI タイムアウト秒数",
+    )
     parser.add_argument(
         "--claude-extra-arg",
         action="append",
@@ -60,6 +65,11 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="--dangerously-skip-permissions を無効化する場合に指定。",
     )
+    parser.add_argument(
+        "--claude-persistent",
+        action="store_true",
+        help="Claude CLI を 1 プロセス起動したまま stream-json で呼び出す (非対応なら毎回起動に戻る)。",
+    )
     parser.add_argument(
         "--episodes",
         type=int,
@@ -141,55 +151,55 @@ def build_parser() -> argparse.ArgumentParser:
 
 def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     parser = build_parser()
-    defaults = parser.parse_args([])
     args = parser.parse_args(argv)
     if args.config:
         config_data = load_config_file(Path(args.config))
-        apply_config_overrides(args, defaults, config_data)
+        apply_config_overrides(args, parser_defaults(parser, config_data), config_data)
     return args
 
 
-def _extra_args(value: Optional[List[str]]) -> List[str]:
-    if not value:
-        return []
-    return value
+def parser_defaults(parser: argparse.ArgumentParser, dests: Iterable[str]) -> argparse.Namespace:
+    # 既定値を得るためだけに parse_args([]) をもう一度走らせず、必要な項目だけを引く
+    return argparse.Namespace(**{dest: parser.get_default(dest) for dest in dests})
 
 
 def build_config(args: argparse.Namespace) -> LoopConfig:
+    default_ace = DEFAULT_CONFIG.ace
     llm_cfg = LLMConfig(
         mode=args.llm_mode,
-        claude_binary=args.claude_binary or DEFAULT_CONFIG.llm.claude_binary,
-        claude_model=args.claude_model or DEFAULT_CONFIG.llm.claude_model,
-        claude_timeout=args.claude_timeout or DEFAULT_CONFIG.llm.claude_timeout,
-        claude_extra_args=_extra_args(args.claude_extra_arg),
+        claude_binary=args.claude_binary,
+        claude_model=args.claude_model,
+        claude_timeout=args.claude_timeout,
+        claude_extra_args=args.claude_extra_arg or [],
         claude_skip_permissions=not args.claude_allow_permissions,
+        claude_persistent=args.claude_persistent,
     )
     ace_mode = args.ace_mode
     if ace_mode == "auto":
         ace_mode = "llm" if llm_cfg.mode == "claude-cli" else "heuristic"
-    playbook_root = Path(args.playbook_root) if args.playbook_root else DEFAULT_CONFIG.ace.playbook_root
+    playbook_root = Path(args.playbook_root) if args.playbook_root else default_ace.playbook_root
     refine_interval = (
         args.playbook_refine_every
         if args.playbook_refine_every is not None
-        else DEFAULT_CONFIG.ace.refine_interval
+        else default_ace.refine_interval
     )
     max_deltas = (
-        args.ace_max_deltas if args.ace_max_deltas is not None else DEFAULT_CONFIG.ace.max_deltas_per_tick
+        args.ace_max_deltas if args.ace_max_deltas is not None else default_ace.max_deltas_per_tick
     )
     context_limit = (
         args.playbook_context_limit
         if args.playbook_context_limit is not None
-        else DEFAULT_CONFIG.ace.playbook_context_limit
+        else default_ace.playbook_context_limit
     )
     context_chars = (
         args.playbook_context_chars
         if args.playbook_context_chars is not None
-        else DEFAULT_CONFIG.ace.playbook_context_chars
+        else default_ace.playbook_context_chars
     )
     max_sections = (
         args.playbook_max_sections
         if args.playbook_max_sections is not None
-        else DEFAULT_CONFIG.ace.playbook_max_sections
+        else default_ace.playbook_max_sections
     )
     ace_cfg = ACEConfig(
         enabled=args.enable_ace,
@@ -218,8 +228,12 @@ def main():
     args = parse_args()
     config = build_config(args)
 
-    if config.ace.enabled and (ACECurator is None or ACEReflector is None or PlaybookStore is None):
-        raise RuntimeError("ACEモジュールが読み込めません。インストール状況を確認してください。")
+    # ACE / Claude CLI / ダッシュボードは有効化されたときだけ読み込む
+    if config.ace.enabled:
+        try:
+            from yamada7.ace import ACECurator, ACEReflector, PlaybookStore
+        except ImportError as exc:  # pragma: no cover - fallback when ACE is not installed
+            raise RuntimeError("ACEモジュールが読み込めません。インストール状況を確認してください。") from exc
 
     memory_path = Path(config.memory_root)
     memory_path.mkdir(parents=True, exist_ok=True)
@@ -230,20 +244,24 @@ def main():
     memory_manager = MemoryManager(root=memory_path)
     claude_client = None
     if config.llm.mode == "claude-cli":
+        from yamada7.llm import ClaudeCodeClient
+
         claude_client = ClaudeCodeClient(
             binary=config.llm.claude_binary,
             model=config.llm.claude_model,
             timeout=config.llm.claude_timeout,
             extra_args=config.llm.claude_extra_args,
             skip_permissions=config.llm.claude_skip_permissions,
+            persistent=config.llm.claude_persistent,
         )
         logger.info(
-            "Claude CLI モードを使用します (binary=%s, model=%s, timeout=%ss, extra=%s, skip_permissions=%s)",
+            "Claude CLI モードを使用します (binary=%s, model=%s, timeout=%ss, extra=%s, skip_permissions=%s, persistent=%s)",
             config.llm.claude_binary,
             config.llm.claude_model,
             config.llm.claude_timeout,
             config.llm.claude_extra_args,
             config.llm.claude_skip_permissions,
+            config.llm.claude_persistent,
         )
 
     thinker = LLMThinker(config=config.llm, seed=args.seed, claude_client=claude_client)
@@ -282,10 +300,13 @@ def main():
     if save_root:
         save_root.mkdir(parents=True, exist_ok=True)
 
+    execution_engine = None
     for episode_index in range(max(1, args.episodes)):
         episode_seed = base_seed + episode_index
         environment = GridWorldEnvironment(seed=episode_seed)
-        execution_engine = ExecutionEngine(allowed_actions=environment.action_schema)
+        if execution_engine is None:
+            # action_schema はシードに依存しないため、エピソード間で使い回す
+            execution_engine = ExecutionEngine(allowed_actions=environment.action_schema)
         loop = FeedbackLoop(
             environment=environment,
             state_formatter=state_formatter,
@@ -302,8 +323,12 @@ def main():
         if dashboard_publisher:
             loop.attach_dashboard(dashboard_publisher)
 
-        snapshots = loop.run(max_ticks=config.tick_limit, tick_delay=args.tick_delay)
-        summary = summarize_episode(snapshots, episode_index)
+        recorder = EpisodeRecorder(episode_index, save_root)
+        try:
+            loop.run(max_ticks=config.tick_limit, tick_delay=args.tick_delay, on_snapshot=recorder)
+        finally:
+            recorder.close()
+        summary = recorder.summary()
         summaries.append(summary)
 
         logger.info(
@@ -315,8 +340,9 @@ def main():
             summary["final_unknown"],
         )
 
-        if save_root:
-            save_episode_snapshots(save_root, episode_index, snapshots)
+    memory_manager.close()
+    if claude_client is not None:
+        claude_client.close()
 
     report = aggregate_summaries(summaries)
     logger.info(
@@ -333,38 +359,72 @@ def main():
         time.sleep(args.linger)
 
 
-def summarize_episode(snapshots: List[LoopSnapshot], episode_index: int) -> Dict[str, float]:
-    if not snapshots:
+class EpisodeRecorder:
+    """Consumes snapshots tick by tick, keeping only summary counters in memory.
+
+    save_root が指定されている場合はスナップショットを JSONL に逐次書き出す。
+    """
+
+    def __init__(self, episode_index: int, save_root: Optional[Path] = None):
+        self.episode_index = episode_index
+        self.ticks = 0
+        self.total_reward = 0.0
+        self.final_data: Dict[str, Any] = {}
+        self.file_path: Optional[Path] = None
+        self._fh = None
+        self._pending: List[bytes] = []
+        if save_root:
+            timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+            self.file_path = save_root / f"episode-{episode_index + 1}-{timestamp}.jsonl"
+            self._fh = self.file_path.open("wb")
+
+    def __call__(self, snapshot: LoopSnapshot):
+        self.ticks += 1
+        self.total_reward += snapshot.reward.external_reward + snapshot.reward.internal_reward
+        self.final_data = snapshot.observation.data
+        if self._fh is not None:
+            self._pending.append(encode_snapshot_line(snapshot))
+            if len(self._pending) >= SNAPSHOT_WRITE_BATCH:
+                self._flush()
+
+    def close(self):
+        if self._fh is None:
+            return
+        self._flush()
+        self._fh.close()
+        self._fh = None
+        if self.ticks == 0:
+            self.file_path.unlink(missing_ok=True)
+
+    def summary(self) -> Dict[str, float]:
         return {
-            "episode": episode_index + 1,
-            "ticks": 0,
-            "total_reward": 0.0,
-            "final_life": 0.0,
-            "final_unknown": 0.0,
+            "episode": self.episode_index + 1,
+            "ticks": self.ticks,
+            "total_reward": self.total_reward,
+            "final_life": self.final_data.get("life", 0.0),
+            "final_unknown": self.final_data.get("unknown", 0.0),
         }
 
-    total_reward = sum(s.reward.external_reward + s.reward.internal_reward for s in snapshots)
-    final = snapshots[-1]
-    return {
-        "episode": episode_index + 1,
-        "ticks": len(snapshots),
-        "total_reward": total_reward,
-        "final_life": final.observation.data.get("life", 0.0),
-        "final_unknown": final.observation.data.get("unknown", 0.0),
-    }
+    def _flush(self):
+        # 1行ずつ書かずにバッチ単位でまとめて書き込む
+        if self._pending:
+            self._fh.write(b"".join(self._pending))
+            self._pending.clear()
 
 
 def aggregate_summaries(summaries: List[Dict[str, float]]) -> Dict[str, float]:
     episodes = len(summaries)
     if episodes == 0:
         return {"episodes": 0, "avg_ticks": 0.0, "avg_reward": 0.0, "total_reward": 0.0}
-    avg_ticks = sum(item["ticks"] for item in summaries) / episodes
-    avg_reward = sum(item["total_reward"] for item in summaries) / episodes
-    total_reward = sum(item["total_reward"] for item in summaries)
+    total_ticks = 0
+    total_reward = 0.0
+    for item in summaries:
+        total_ticks += item["ticks"]
+        total_reward += item["total_reward"]
     return {
         "episodes": episodes,
-        "avg_ticks": avg_ticks,
-        "avg_reward": avg_reward,
+        "avg_ticks": total_ticks / episodes,
+        "avg_reward": total_reward / episodes,
         "total_reward": total_reward,
     }
 
@@ -383,45 +443,41 @@ def load_config_file(path: Path) -> Dict[str, Any]:
 
 
 def apply_config_overrides(args: argparse.Namespace, defaults: argparse.Namespace, config_data: Dict[str, Any]):
+    current = vars(args)
+    default_values = vars(defaults)
     for key, value in config_data.items():
-        if not hasattr(args, key):
-            continue
-        if getattr(args, key) == getattr(defaults, key):
-            setattr(args, key, value)
+        if key in current and current[key] == default_values[key]:
+            current[key] = value
 
 
-def save_episode_snapshots(root: Path, episode_index: int, snapshots: List[LoopSnapshot]):
-    if not snapshots:
-        return
-    timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
-    file_path = root / f"episode-{episode_index + 1}-{timestamp}.jsonl"
-    with file_path.open("w", encoding="utf-8") as fh:
-        for snapshot in snapshots:
-            fh.write(json.dumps(serialize_snapshot(snapshot), ensure_ascii=False) + "\n")
+def encode_snapshot_line(snapshot: LoopSnapshot) -> bytes:
+    return jsonio.dumps_bytes(serialize_snapshot(snapshot), newline=True)
 
 
 def serialize_snapshot(snapshot: LoopSnapshot) -> Dict:
-    def serialize_events(events: List[ExecutionEvent]) -> List[Dict[str, Any]]:
-        return [
-            {
-                "timestamp": event.timestamp.isoformat(),
-                "channel": event.channel.value,
-                "payload": event.payload,
-            }
-            for event in events
-        ]
-
+    # asdict は deepcopy を伴うため、既知のフィールドを直接組み立てる
+    observation = snapshot.observation
+    formatted_state = snapshot.formatted_state
+    plan = snapshot.action_plan
+    reward = snapshot.reward
+    reflection = snapshot.reflection
     return {
         "tick": snapshot.tick,
-        "observation": asdict(snapshot.observation),
+        "observation": {
+            "tick": observation.tick,
+            "data": observation.data,
+            "reward": observation.reward,
+            "done": observation.done,
+            "info": observation.info,
+        },
         "formatted_state": {
-            "summary": snapshot.formatted_state.summary,
-            "slots": snapshot.formatted_state.slots,
-            "memory_highlights": snapshot.formatted_state.memory_highlights,
+            "summary": formatted_state.summary,
+            "slots": formatted_state.slots,
+            "memory_highlights": formatted_state.memory_highlights,
         },
         "action_plan": {
-            "intent": snapshot.action_plan.intent,
-            "sub_goals": snapshot.action_plan.sub_goals,
+            "intent": plan.intent,
+            "sub_goals": plan.sub_goals,
             "actions": [
                 {
                     "action_id": action.action_id,
@@ -429,22 +485,29 @@ def serialize_snapshot(snapshot: LoopSnapshot) -> Dict:
                     "confidence": action.confidence,
                     "risk_estimate": action.risk_estimate,
                 }
-                for action in snapshot.action_plan.actions
+                for action in plan.actions
             ],
-            "notes": snapshot.action_plan.notes,
+            "notes": plan.notes,
         },
         "reward": {
-            "external": snapshot.reward.external_reward,
-            "internal": snapshot.reward.internal_reward,
-            "components": snapshot.reward.components,
+            "external": reward.external_reward,
+            "internal": reward.internal_reward,
+            "components": reward.components,
         },
         "reflection": {
-            "summary": snapshot.reflection.summary,
-            "alert_updates": snapshot.reflection.fear_updates,
-            "exploration_updates": snapshot.reflection.curiosity_updates,
-            "next_bias": snapshot.reflection.next_bias,
+            "summary": reflection.summary,
+            "alert_updates": reflection.fear_updates,
+            "exploration_updates": reflection.curiosity_updates,
+            "next_bias": reflection.next_bias,
         },
-        "events": serialize_events(snapshot.events),
+        "events": [
+            {
+                "timestamp": event.timestamp.isoformat(),
+                "channel": event.channel.value,
+                "payload": event.payload,
+            }
+            for event in snapshot.events
+        ],
         "playbook_updates": snapshot.playbook_updates,
         "playbook_stats": snapshot.playbook_stats,
     }
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from heapq import nlargest
+from operator import attrgetter
+from typing import Dict, List
 
 from .playbook import PlaybookDelta, PlaybookStore
 
 
-@dataclass
+@dataclass(slots=True)
 class RejectedDelta:
     delta: PlaybookDelta
     reason: str
 
+    def to_dict(self) -> Dict:
+        delta = self.delta
+        return {
+            "target": delta.target,
+            "change_type": delta.change_type,
+            "status": "rejected",
+            "reason": self.reason,
+            "content": delta.content,
+            "priority": delta.priority,
+            "tags": delta.tags,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class CurationResult:
     accepted: List[PlaybookDelta]
     rejected: List[RejectedDelta]
@@ -25,22 +39,22 @@ class ACECurator:
         self.max_per_tick = max_per_tick
 
     def curate(self, deltas: List[PlaybookDelta], store: PlaybookStore) -> CurationResult:
-        accepted: List[PlaybookDelta] = []
         rejected: List[RejectedDelta] = []
-
-        # 優先度の高い順に処理
-        ordered = sorted(deltas, key=lambda d: d.priority, reverse=True)
-        for delta in ordered:
-            if len(accepted) >= self.max_per_tick:
-                rejected.append(RejectedDelta(delta=delta, reason="max_per_tick_reached"))
-                continue
+        eligible: List[PlaybookDelta] = []
+        for delta in deltas:
             if not delta.content.strip():
                 rejected.append(RejectedDelta(delta=delta, reason="empty_content"))
-                continue
-            if store.contains(delta):
+            elif store.contains(delta):
                 rejected.append(RejectedDelta(delta=delta, reason="duplicate_in_playbook"))
-                continue
-            accepted.append(delta)
+            else:
+                eligible.append(delta)
+
+        # 優先度の高い順に上限件数だけ採用（全件ソートはしない）
+        accepted = nlargest(self.max_per_tick, eligible, key=attrgetter("priority"))
+        accepted_ids = {id(delta) for delta in accepted}
+        for delta in eligible:
+            if id(delta) not in accepted_ids:
+                rejected.append(RejectedDelta(delta=delta, reason="max_per_tick_reached"))
 
         return CurationResult(accepted=accepted, rejected=rejected)
 
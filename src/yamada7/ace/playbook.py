@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-import json
+import hashlib
+import os
+import time
 from dataclasses import dataclass, field
+from functools import cached_property
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+from ..core import jsonio
 from ..core.models import Channel, ExecutionEvent
 
 
-@dataclass
+@dataclass(slots=True)
 class PlaybookDelta:
     """Reflectorが生成するプレイブック差分。"""
 
@@ -31,7 +35,7 @@ class PlaybookDelta:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AppliedDelta:
     delta: PlaybookDelta
     status: str  # applied / skipped / deferred
@@ -50,6 +54,62 @@ class AppliedDelta:
 
 
 SEPARATOR = "\n\n---\n\n"
+SEP_BYTES = SEPARATOR.encode("utf-8")
+_UNSAFE_TARGET_CHARS = str.maketrans({"/": "_"})
+
+
+def _section_digest(section: bytes) -> bytes:
+    return hashlib.blake2b(section, digest_size=8).digest()
+
+
+def _split_sections(text: str) -> List[bytes]:
+    # 空白の除去は str で行う (bytes.strip は ASCII の空白しか落とさず、全角空白などが残る)
+    return [stripped.encode("utf-8") for stripped in (segment.strip() for segment in text.split(SEPARATOR)) if stripped]
+
+
+def _read_bytes(path: str, size_hint: int) -> bytes:
+    """小さな UTF-8 ファイルを TextIOWrapper を介さず os.read で読む。"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks: List[bytes] = []
+        while True:
+            chunk = os.read(fd, max(size_hint, 4096))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    data = b"".join(chunks)
+    # read_text と同様に改行を \n に揃える (Windows で書かれたファイル向け)
+    return data.replace(b"\r\n", b"\n") if b"\r" in data else data
+
+
+@dataclass
+class _CachedFile:
+    """current/ 以下の Markdown 1 ファイル分のメモリ上のコピー (UTF-8 のバイト列で保持)。"""
+
+    mtime: float
+    data: bytes
+    sections: List[bytes] = field(default_factory=list)
+    digests: Set[bytes] = field(default_factory=set)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, mtime: float) -> "_CachedFile":
+        # 書き込み・読み込み時に 1 度だけセクションへ分割しておく (デコード結果は text として使い回す)
+        text = data.decode("utf-8")
+        sections = _split_sections(text)
+        cached = cls(mtime=mtime, data=data, sections=sections, digests={_section_digest(s) for s in sections})
+        cached.__dict__["text"] = text
+        return cached
+
+    @cached_property
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+    def has_sections(self, content: str) -> bool:
+        """content の各セクションが既に全て含まれているかをダイジェストで判定する。"""
+        segments = _split_sections(content)
+        return all(_section_digest(segment) in self.digests for segment in segments)
 
 
 class PlaybookStore:
@@ -72,42 +132,50 @@ class PlaybookStore:
         self.archive_dir = self.root / "archive"
         self.metadata_file = self.root / "metadata.json"
         self.delta_log = self.delta_dir / "history.jsonl"
+        # current/ 以下のファイル内容はこのストア経由でのみ更新される前提でメモリに保持する
+        self._cache: Optional[Dict[str, _CachedFile]] = None
+        self._target_paths: Dict[str, Path] = {}
+        self._handlers: Dict[str, Callable[[PlaybookDelta, str], AppliedDelta]] = {
+            "add": self._apply_add_update,
+            "update": self._apply_add_update,
+            "retire": self._apply_retire,
+        }
         self._ensure_structure()
 
     def _ensure_structure(self):
         for path in [self.root, self.current_dir, self.delta_dir, self.archive_dir]:
             path.mkdir(parents=True, exist_ok=True)
         if not self.metadata_file.exists():
-            self.metadata_file.write_text(json.dumps({"version": 1, "created_at": datetime.utcnow().isoformat()}), encoding="utf-8")
+            self.metadata_file.write_bytes(jsonio.dumps_bytes({"version": 1, "created_at": datetime.utcnow().isoformat()}))
 
     # ------------------------------------------------------------------
     # public API
     # ------------------------------------------------------------------
     def get_context(self) -> List[str]:
-        candidates = sorted(self.current_dir.glob("*.md"), key=lambda p: p.stat().st_mtime, reverse=True)
-        snippets: List[str] = []
-        for path in candidates[: self.context_limit]:
-            text = path.read_text(encoding="utf-8").strip()
-            snippets.append(text[: self.context_chars])
-        return snippets
+        candidates = sorted(self._files().values(), key=lambda cached: cached.mtime, reverse=True)
+        return [cached.text.strip()[: self.context_chars] for cached in candidates[: self.context_limit]]
 
     def contains(self, delta: PlaybookDelta) -> bool:
-        target_path = self._target_path(delta.target)
-        if not target_path.exists():
+        cached = self._files().get(self._target_path(delta.target).name)
+        if cached is None:
             return False
-        text = target_path.read_text(encoding="utf-8")
-        return delta.content.strip() in text
+        return cached.has_sections(delta.content)
 
     def apply_deltas(self, deltas: Iterable[PlaybookDelta], tick: int) -> Tuple[List[AppliedDelta], List[ExecutionEvent]]:
         applied: List[AppliedDelta] = []
         events: List[ExecutionEvent] = []
+        log_lines: List[bytes] = []
+        # 1 回の呼び出し (= 1 ティック) 内の差分は同じ時刻を共有する
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        archive_stamp = now.strftime("%Y%m%d%H%M%S")
         for delta in deltas:
-            record = self._apply_single(delta)
+            record = self._apply_single(delta, archive_stamp)
             applied.append(record)
-            self._append_delta_log(delta, tick, record.status, record.reason)
+            log_lines.append(self._serialize_log_entry(delta, tick, record.status, record.reason, now_iso))
             events.append(
                 ExecutionEvent(
-                    timestamp=datetime.utcnow(),
+                    timestamp=now,
                     channel=Channel.EVENTS,
                     payload={
                         "level": "info" if record.status == "applied" else "warn",
@@ -119,26 +187,28 @@ class PlaybookStore:
                     },
                 )
             )
+        if log_lines:
+            with self.delta_log.open("ab") as fh:
+                fh.writelines(log_lines)
         return applied, events
 
     def refine(self, note: str) -> ExecutionEvent:
+        timestamp = datetime.utcnow()
+        archive_stamp = timestamp.strftime("%Y%m%d%H%M%S")
         pruned_sections = 0
         archived_files: List[str] = []
-        for path in self.current_dir.glob("*.md"):
-            content = path.read_text(encoding="utf-8").strip()
-            if not content:
-                continue
-            sections = [segment.strip() for segment in content.split(SEPARATOR) if segment.strip()]
+        for name, cached in list(self._files().items()):
+            sections = cached.sections
             if len(sections) <= self.max_sections:
                 continue
             keep = sections[-self.max_sections :]
             retired = sections[: -self.max_sections]
-            path.write_text(SEPARATOR.join(keep) + "\n", encoding="utf-8")
-            archive_path = self._archive_path(path.stem + "_refine")
-            archive_path.write_text(SEPARATOR.join(retired) + "\n", encoding="utf-8")
+            path = self.current_dir / name
+            self._write(path, SEP_BYTES.join(keep) + b"\n")
+            archive_path = self._archive_path(path.stem + "_refine", archive_stamp)
+            archive_path.write_bytes(SEP_BYTES.join(retired) + b"\n")
             pruned_sections += len(retired)
             archived_files.append(path.name)
-        timestamp = datetime.utcnow()
         payload = {
             "level": "info",
             "message": f"Playbook refined: {note}",
@@ -148,14 +218,12 @@ class PlaybookStore:
         return ExecutionEvent(timestamp=timestamp, channel=Channel.LOGS, payload=payload)
 
     def stats(self) -> Dict[str, int]:
-        files = list(self.current_dir.glob("*.md"))
+        files = self._files()
         sections = 0
         characters = 0
-        for path in files:
-            text = path.read_text(encoding="utf-8")
-            characters += len(text)
-            if text.strip():
-                sections += len([segment for segment in text.split(SEPARATOR) if segment.strip()])
+        for cached in files.values():
+            characters += len(cached.text)
+            sections += len(cached.sections)
         return {
             "files": len(files),
             "sections": sections,
@@ -165,50 +233,79 @@ class PlaybookStore:
     # ------------------------------------------------------------------
     # helpers
     # ------------------------------------------------------------------
-    def _apply_single(self, delta: PlaybookDelta) -> AppliedDelta:
-        target_path = self._target_path(delta.target)
-        if delta.change_type not in {"add", "update", "retire"}:
+    def _apply_single(self, delta: PlaybookDelta, archive_stamp: str) -> AppliedDelta:
+        handler = self._handlers.get(delta.change_type)
+        if handler is None:
             return AppliedDelta(delta=delta, status="skipped", reason="unsupported_change_type")
+        return handler(delta, archive_stamp)
 
-        if delta.change_type == "retire":
-            if not target_path.exists():
-                return AppliedDelta(delta=delta, status="skipped", reason="target_not_found")
-            archive_path = self._archive_path(delta.target)
-            archive_path.write_text(target_path.read_text(encoding="utf-8"), encoding="utf-8")
-            target_path.unlink(missing_ok=True)
-            return AppliedDelta(delta=delta, status="applied")
-
-        # add / update
-        existing = target_path.read_text(encoding="utf-8") if target_path.exists() else ""
-        if delta.content.strip() in existing:
+    def _apply_retire(self, delta: PlaybookDelta, archive_stamp: str) -> AppliedDelta:
+        target_path = self._target_path(delta.target)
+        cached = self._files().pop(target_path.name, None)
+        if cached is None:
+            return AppliedDelta(delta=delta, status="skipped", reason="target_not_found")
+        archive_path = self._archive_path(delta.target, archive_stamp)
+        archive_path.write_bytes(cached.data)
+        target_path.unlink(missing_ok=True)
+        return AppliedDelta(delta=delta, status="applied")
+
+    def _apply_add_update(self, delta: PlaybookDelta, archive_stamp: str) -> AppliedDelta:
+        target_path = self._target_path(delta.target)
+        cached = self._files().get(target_path.name)
+        existing = cached.data if cached is not None else b""
+        if not delta.content.strip() or (cached is not None and cached.has_sections(delta.content)):
             return AppliedDelta(delta=delta, status="skipped", reason="duplicate_content")
 
-        new_text = self._compose_text(existing, delta.content, delta.change_type)
-        target_path.write_text(new_text, encoding="utf-8")
+        new_data = self._compose_bytes(existing, delta.content, delta.change_type)
+        self._write(target_path, new_data)
         return AppliedDelta(delta=delta, status="applied")
 
-    def _compose_text(self, existing: str, content: str, change_type: str) -> str:
-        if not existing.strip():
-            header = ""
-            return header + content.strip() + "\n"
-        return existing.rstrip() + SEPARATOR + content.strip() + "\n"
+    def _files(self) -> Dict[str, _CachedFile]:
+        if self._cache is None:
+            cache: Dict[str, _CachedFile] = {}
+            # 初回のみディレクトリを走査する。DirEntry.stat() は readdir の結果を再利用できる
+            with os.scandir(self.current_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".md") or not entry.is_file():
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    cache[entry.name] = _CachedFile.from_bytes(_read_bytes(entry.path, stat.st_size), stat.st_mtime)
+            self._cache = cache
+        return self._cache
 
-    def _append_delta_log(self, delta: PlaybookDelta, tick: int, status: str, reason: Optional[str]):
+    def _write(self, path: Path, data: bytes):
+        path.write_bytes(data)
+        self._files()[path.name] = _CachedFile.from_bytes(data, time.time())
+
+    def _compose_bytes(self, existing: bytes, content: str, change_type: str) -> bytes:
+        body = content.strip().encode("utf-8") + b"\n"
+        existing_text = existing.decode("utf-8")
+        if not existing_text.strip():
+            return body
+        return existing_text.rstrip().encode("utf-8") + SEP_BYTES + body
+
+    def _serialize_log_entry(
+        self,
+        delta: PlaybookDelta,
+        tick: int,
+        status: str,
+        reason: Optional[str],
+        timestamp: str,
+    ) -> bytes:
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
             "tick": tick,
             "status": status,
             "reason": reason,
             **delta.to_dict(),
         }
-        with self.delta_log.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return jsonio.dumps_bytes(entry, newline=True)
 
     def _target_path(self, target: str) -> Path:
-        safe = target.replace("/", "_")
-        return self.current_dir / f"{safe}.md"
+        path = self._target_paths.get(target)
+        if path is None:
+            path = self._target_paths[target] = self.current_dir / f"{target.translate(_UNSAFE_TARGET_CHARS)}.md"
+        return path
 
-    def _archive_path(self, target: str) -> Path:
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        safe = target.replace("/", "_")
-        return self.archive_dir / f"{safe}_{timestamp}.md"
+    def _archive_path(self, target: str, timestamp: str) -> Path:
+        return self.archive_dir / f"{target.translate(_UNSAFE_TARGET_CHARS)}_{timestamp}.md"
@@ -4,12 +4,34 @@ import textwrap
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional
 
+from ..core import jsonio
 from ..core.models import LoopSnapshot
 from ..llm.claude_cli import ClaudeCodeClient
 from .playbook import PlaybookDelta
 
+_SUCCESS_TEMPLATE = textwrap.dedent(
+    """
+    ## Tick {tick} 成功戦術
+    - 状況: {summary}
+    - 実行アクション: {actions}
+    - 獲得報酬: 外部={external:.3f}, 内部={internal:.3f}
+    - 反省要約: {reflection}
+    """
+).strip()
 
-@dataclass
+_ALERT_TEMPLATE = textwrap.dedent(
+    """
+    ## Tick {tick} 調整メモ
+    - 状況: {summary}
+    {notes}
+    - 次の方針: {reflection}
+    """
+).strip()
+
+_CONTEXT_LINE = "\n- 参考プレイブック抜粋: {context}"
+
+
+@dataclass(slots=True)
 class ACEReflector:
     """Executorの行動結果からプレイブック差分を生成する。"""
 
@@ -59,7 +81,8 @@ class ACEReflector:
             },
             "playbook_context": list(playbook_context),
         }
-        raw = self.claude_client.generate_playbook_deltas(payload)
+        # ペイロードは orjson (あれば) で直接エンコードしてから CLI クライアントに渡す
+        raw = self.claude_client.generate_playbook_deltas_json(jsonio.dumps(payload))
         deltas: List[PlaybookDelta] = []
         for entry in raw:
             content = (entry.get("content") or "").strip()
@@ -89,18 +112,17 @@ class ACEReflector:
         failures = snapshot.execution.failures
         warnings = snapshot.execution.warnings
         context_note = playbook_context[0][:160] if playbook_context else ""
+        context_line = _CONTEXT_LINE.format(context=context_note) if context_note else ""
 
         if successes and reward_total > 0:
-            content = textwrap.dedent(
-                f"""
-                ## Tick {snapshot.tick} 成功戦術
-                - 状況: {snapshot.formatted_state.summary}
-                - 実行アクション: {', '.join(s.get('action') for s in successes if s.get('action'))}
-                - 獲得報酬: 外部={snapshot.reward.external_reward:.3f}, 内部={snapshot.reward.internal_reward:.3f}
-                - 反省要約: {snapshot.reflection.summary}
-                {f'- 参考プレイブック抜粋: {context_note}' if context_note else ''}
-                """
-            ).strip()
+            content = _SUCCESS_TEMPLATE.format(
+                tick=snapshot.tick,
+                summary=snapshot.formatted_state.summary,
+                actions=", ".join([s["action"] for s in successes if s.get("action")]),
+                external=snapshot.reward.external_reward,
+                internal=snapshot.reward.internal_reward,
+                reflection=snapshot.reflection.summary,
+            ) + context_line
             deltas.append(
                 PlaybookDelta(
                     target="survival_playbook",
@@ -118,15 +140,12 @@ class ACEReflector:
                 notes.append(f"- 行動 {failure.get('action')} は失敗: {failure.get('detail')}")
             for warning in warnings[:2]:
                 notes.append(f"- 注意: {warning}")
-            content = textwrap.dedent(
-                f"""
-                ## Tick {snapshot.tick} 調整メモ
-                - 状況: {snapshot.formatted_state.summary}
-                {chr(10).join(notes)}
-                - 次の方針: {snapshot.reflection.summary}
-                {f'- 参考プレイブック抜粋: {context_note}' if context_note else ''}
-                """
-            ).strip()
+            content = _ALERT_TEMPLATE.format(
+                tick=snapshot.tick,
+                summary=snapshot.formatted_state.summary,
+                notes="\n".join(notes),
+                reflection=snapshot.reflection.summary,
+            ) + context_line
             deltas.append(
                 PlaybookDelta(
                     target="alert_notes",
@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMConfig:
     """Configuration for LLM planner integration."""
 
@@ -13,9 +13,10 @@ class LLMConfig:
     claude_timeout: int = 90
     claude_extra_args: List[str] = field(default_factory=list)
     claude_skip_permissions: bool = True
+    claude_persistent: bool = False
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ACEConfig:
     """Configuration for Agentic Context Engineering modules."""
 
@@ -42,5 +43,9 @@ class LoopConfig:
     llm: LLMConfig = field(default_factory=LLMConfig)
     ace: ACEConfig = field(default_factory=ACEConfig)
 
+    def __post_init__(self):
+        # memory_root は Path のまま受け渡す前提(文字列を渡されたら呼び出し側の誤り)
+        assert isinstance(self.memory_root, Path)
+
 
 DEFAULT_CONFIG = LoopConfig()
@@ -18,26 +18,39 @@ class ExecutionEngine:
     allowed_actions: Iterable[str]
 
     def __post_init__(self):
-        self._allowed = set(self.allowed_actions)
+        self._allowed = frozenset(self.allowed_actions)
+        self._wait_available = "wait" in self._allowed
 
     def execute(
-        self, env: Environment, plan: ActionPlan
-    ) -> Tuple[ExecutionResult, Observation, float, List[Observation]]:
+        self, env: Environment, plan: ActionPlan, timestamp: Optional[datetime] = None
+    ) -> Tuple[ExecutionResult, Observation, float, List[Observation], List[ExecutionEvent]]:
+        """Run the plan and build its events (actions, successes, warnings, failures) in the same pass."""
+        if timestamp is None:
+            timestamp = datetime.utcnow()
         result = ExecutionResult()
+        success_events: List[ExecutionEvent] = []
+        warning_events: List[ExecutionEvent] = []
+        failure_events: List[ExecutionEvent] = []
         final_observation: Optional[Observation] = None
         step_observations: List[Observation] = []
         accumulated_reward = 0.0
-        for candidate in plan.actions:
-            if candidate.action_id not in self._allowed:
-                detail = {
-                    "action": candidate.action_id,
-                    "detail": "blocked - not in whitelist",
-                    "risk": candidate.risk_estimate,
-                }
-                result.failures.append(detail)
+        allowed = self._allowed
+        runnable = [candidate for candidate in plan.actions if candidate.action_id in allowed]
+        if len(runnable) != len(plan.actions):
+            for candidate in plan.actions:
+                if candidate.action_id in allowed:
+                    continue
+                result.failures.append(
+                    {
+                        "action": candidate.action_id,
+                        "detail": "blocked - not in whitelist",
+                        "risk": candidate.risk_estimate,
+                    }
+                )
+                failure_events.append(_failure_event(timestamp, candidate.action_id))
                 logger.warning("Blocking disallowed action %s", candidate.action_id)
-                continue
 
+        for candidate in runnable:
             # Placeholder: assume success but note risk
             final_observation = env.step(candidate.action_id, **candidate.parameters)
             step_observations.append(final_observation)
@@ -48,29 +61,36 @@ class ExecutionEngine:
                 "risk": candidate.risk_estimate,
             }
             result.successes.append(detail)
+            success_events.append(_success_event(timestamp, candidate.action_id))
 
             if candidate.risk_estimate > 0.7:
-                result.warnings.append(f"High risk action {candidate.action_id} (risk={candidate.risk_estimate:.2f})")
+                warning = f"High risk action {candidate.action_id} (risk={candidate.risk_estimate:.2f})"
+                result.warnings.append(warning)
+                warning_events.append(_warning_event(timestamp, warning))
 
             if final_observation.done:
-                result.warnings.append("Environment reached terminal state.")
+                warning = "Environment reached terminal state."
+                result.warnings.append(warning)
+                warning_events.append(_warning_event(timestamp, warning))
                 break
 
         if not plan.actions:
             logger.info("Plan contained no actions; issuing wait.")
-            if "wait" in self._allowed:
+            if self._wait_available:
                 final_observation = env.step("wait")
                 step_observations.append(final_observation)
                 accumulated_reward += final_observation.reward
                 result.successes.append({"action": "wait", "detail": "auto wait", "risk": 0.0})
+                success_events.append(_success_event(timestamp, "wait"))
             else:
                 result.failures.append({"action": "wait", "detail": "no wait action available", "risk": 0.0})
+                failure_events.append(_failure_event(timestamp, "wait"))
 
         if final_observation is None:
             # fallback to no-op observation (env should provide)
             final_observation = (
                 env.step("wait")
-                if "wait" in self._allowed
+                if self._wait_available
                 else Observation(
                     tick=-1,
                     data={},
@@ -82,39 +102,48 @@ class ExecutionEngine:
             step_observations.append(final_observation)
             accumulated_reward += final_observation.reward
 
-        return result, final_observation, accumulated_reward, step_observations
+        events = [_actions_event(timestamp, plan)]
+        events.extend(success_events)
+        events.extend(warning_events)
+        events.extend(failure_events)
+        return result, final_observation, accumulated_reward, step_observations, events
 
     def emit_events(self, plan: ActionPlan, result: ExecutionResult) -> List[ExecutionEvent]:
         timestamp = datetime.utcnow()
-        events = [
-            ExecutionEvent(
-                timestamp=timestamp,
-                channel=Channel.ACTIONS,
-                payload={"intent": plan.intent, "actions": [a.action_id for a in plan.actions]},
-            )
-        ]
-        for success in result.successes:
-            events.append(
-                ExecutionEvent(
-                    timestamp=timestamp,
-                    channel=Channel.LOGS,
-                    payload={"level": "info", "message": f"action {success['action']} completed"},
-                )
-            )
-        for warning in result.warnings:
-            events.append(
-                ExecutionEvent(
-                    timestamp=timestamp,
-                    channel=Channel.EVENTS,
-                    payload={"level": "warn", "message": warning},
-                )
-            )
-        for failure in result.failures:
-            events.append(
-                ExecutionEvent(
-                    timestamp=timestamp,
-                    channel=Channel.EVENTS,
-                    payload={"level": "error", "message": f"{failure['action']} blocked"},
-                )
-            )
+        events = [_actions_event(timestamp, plan)]
+        events.extend(_success_event(timestamp, success["action"]) for success in result.successes)
+        events.extend(_warning_event(timestamp, warning) for warning in result.warnings)
+        events.extend(_failure_event(timestamp, failure["action"]) for failure in result.failures)
         return events
+
+
+def _actions_event(timestamp: datetime, plan: ActionPlan) -> ExecutionEvent:
+    return ExecutionEvent(
+        timestamp=timestamp,
+        channel=Channel.ACTIONS,
+        payload={"intent": plan.intent, "actions": [a.action_id for a in plan.actions]},
+    )
+
+
+def _success_event(timestamp: datetime, action: str) -> ExecutionEvent:
+    return ExecutionEvent(
+        timestamp=timestamp,
+        channel=Channel.LOGS,
+        payload={"level": "info", "message": f"action {action} completed"},
+    )
+
+
+def _warning_event(timestamp: datetime, warning: str) -> ExecutionEvent:
+    return ExecutionEvent(
+        timestamp=timestamp,
+        channel=Channel.EVENTS,
+        payload={"level": "warn", "message": warning},
+    )
+
+
+def _failure_event(timestamp: datetime, action: str) -> ExecutionEvent:
+    return ExecutionEvent(
+        timestamp=timestamp,
+        channel=Channel.EVENTS,
+        payload={"level": "error", "message": f"{action} blocked"},
+    )
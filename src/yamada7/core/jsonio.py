@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+# orjson は常に空白なしで出力するため、標準 json 側も同じ区切りに揃える
+_SEPARATORS = (",", ":")
+
+
+def _default(value: Any):
+    # orjson が標準で扱う型は、標準 json でも同じ表現になるようにする
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def _key(key: Any):
+    if key is None or isinstance(key, (str, int, float)):
+        return key
+    if isinstance(key, Enum):
+        return _key(key.value)
+    if isinstance(key, (datetime, date, time)):
+        return key.isoformat()
+    if isinstance(key, UUID):
+        return str(key)
+    raise TypeError(f"Dict key must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+
+def _normalize_keys(value: Any):
+    if isinstance(value, dict):
+        return {_key(key): _normalize_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_keys(item) for item in value]
+    return value
+
+
+def _dumps_text(value: Any) -> str:
+    try:
+        return json.dumps(value, ensure_ascii=False, default=_default, separators=_SEPARATORS)
+    except TypeError:
+        # 標準 json が受け付けないキー (datetime / Enum など) があるときだけ、
+        # orjson の OPT_NON_STR_KEYS と同じ文字列に変換してから書き直す
+        return json.dumps(_normalize_keys(value), ensure_ascii=False, default=_default, separators=_SEPARATORS)
+
+
+def dumps_bytes(value: Any, newline: bool = False) -> bytes:
+    """Encode value as UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        option = (_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE) if newline else _ORJSON_OPTIONS
+        return orjson.dumps(value, default=_default, option=option)
+    text = _dumps_text(value)
+    return (text + "\n" if newline else text).encode("utf-8")
+
+
+def dumps(value: Any) -> str:
+    """Encode value as a compact JSON string (non-ASCII characters are kept as is)."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+    return _dumps_text(value)
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-import time
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 from typing import TYPE_CHECKING
 
 from ..config import LoopConfig, DEFAULT_CONFIG
@@ -21,6 +24,9 @@ if TYPE_CHECKING:
 
 
 DashboardPublisher = Callable[[LoopSnapshot], None]
+# バックグラウンド配信が溜まってよい最大ティック数。超えたら最も古い配信の完了を待つ
+MAX_PENDING_PUBLISHES = 8
+SnapshotSink = Callable[[LoopSnapshot], None]
 
 
 @dataclass
@@ -39,82 +45,149 @@ class FeedbackLoop:
     ace_reflector: Optional[ACEReflector] = None
     ace_curator: Optional[ACECurator] = None
     dashboard_handlers: List[DashboardPublisher] = field(default_factory=list)
+    sync_dashboard_handlers: List[DashboardPublisher] = field(default_factory=list)
     _ace_history: List[float] = field(default_factory=list, init=False)
 
-    def run(self, max_ticks: Optional[int] = None, tick_delay: float = 0.0) -> List[LoopSnapshot]:
+    def run(
+        self,
+        max_ticks: Optional[int] = None,
+        tick_delay: float = 0.0,
+        on_snapshot: Optional[SnapshotSink] = None,
+    ) -> List[LoopSnapshot]:
+        """Run the loop and return the snapshots.
+
+        When ``on_snapshot`` is given each snapshot is handed to it as soon as the tick
+        completes and nothing is retained, so the returned list is empty.
+        Inside a running event loop (Jupyter, async hosts) use ``await run_async(...)`` instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "FeedbackLoop.run はイベントループの実行中には呼べません。"
+                "代わりに await FeedbackLoop.run_async(...) を使ってください。"
+            )
+        return asyncio.run(self.run_async(max_ticks=max_ticks, tick_delay=tick_delay, on_snapshot=on_snapshot))
+
+    async def run_async(
+        self,
+        max_ticks: Optional[int] = None,
+        tick_delay: float = 0.0,
+        on_snapshot: Optional[SnapshotSink] = None,
+    ) -> List[LoopSnapshot]:
+        """Async variant of :meth:`run`; dashboard handlers run while the next tick is computed."""
         tick_limit = max_ticks or self.config.tick_limit
         snapshots: List[LoopSnapshot] = []
+        event_loop = asyncio.get_running_loop()
+        # ワーカー 1 本なのでダッシュボードへの配信順はティック順のまま保たれる
+        publisher = ThreadPoolExecutor(max_workers=1) if self.dashboard_handlers else None
+        pending_publishes: Deque[asyncio.Future] = deque()
 
         observation = self.environment.reset()
-        previous_unknown = observation.data.get("unknown", 0.0)
-
-        for _ in range(tick_limit):
-            highlights = self.memory_manager.highlights(observation)
-            formatted_state = self.state_formatter.format(observation, highlights)
-            memory_dump = self.memory_manager.export()
-            playbook_context = self.playbook_store.get_context() if self.playbook_store else []
-            if playbook_context:
-                memory_dump["playbook"] = playbook_context
-            plan = self.thinker.plan(formatted_state, list(self.environment.action_schema), memory_dump)
-
-            execution_result, new_observation, action_reward, step_observations = self.execution_engine.execute(
-                self.environment, plan
-            )
-            events = self.execution_engine.emit_events(plan, execution_result)
-            events.extend(self._observation_events(step_observations))
-
-            curiosity_signal = max(0.0, previous_unknown - (new_observation.data.get("unknown", 0.0) or 0.0))
-            reward_observation = Observation(
-                tick=new_observation.tick,
-                data=new_observation.data,
-                reward=action_reward,
-                done=new_observation.done,
-                info=new_observation.info,
-            )
-            reward_breakdown = self.reward_synthesizer.synthesize(reward_observation, curiosity_signal)
-            summary_payload = self.result_formatter.build_summary(reward_observation, execution_result)
-            reflection = self.thinker.reflect(summary_payload, reward_breakdown)
-            self.memory_manager.update(reflection)
-
-            snapshot = LoopSnapshot(
-                tick=new_observation.tick,
-                observation=reward_observation,
-                formatted_state=formatted_state,
-                action_plan=plan,
-                execution=execution_result,
-                reward=reward_breakdown,
-                reflection=reflection,
-            )
-            playbook_updates, ace_events = self._handle_ace(snapshot, playbook_context)
-            if ace_events:
-                events.extend(ace_events)
-            snapshot.events = events
-            snapshot.playbook_updates = playbook_updates
-            if self.playbook_store:
-                snapshot.playbook_stats = self.playbook_store.stats()
-            snapshots.append(snapshot)
+        # action_schema はエピソード中に変わらないため、ティックごとに list を作り直さない
+        allowed_actions = list(self.environment.action_schema)
+        previous_unknown = observation.data.get("unknown", 0.0) or 0.0
+
+        try:
+            for _ in range(tick_limit):
+                highlights = self.memory_manager.highlights(observation)
+                formatted_state = self.state_formatter.format(observation, highlights)
+                memory_dump = self.memory_manager.export()
+                playbook_context = self.playbook_store.get_context() if self.playbook_store else []
+                if playbook_context:
+                    # export() の dict はキャッシュを共有しているので書き換えずに複製する
+                    memory_dump = {**memory_dump, "playbook": playbook_context}
+                plan = await self.thinker.aplan(formatted_state, allowed_actions, memory_dump)
+
+                # 計画確定後のティック内で発生するイベントは同じ時刻を共有する
+                now = datetime.utcnow()
+                execution_result, new_observation, action_reward, step_observations, events = (
+                    self.execution_engine.execute(self.environment, plan, now)
+                )
+                events.extend(self._observation_events(step_observations, now))
+
+                unknown_now = new_observation.data.get("unknown", 0.0) or 0.0
+                curiosity_signal = max(0.0, previous_unknown - unknown_now)
+                # 最後のステップの観測を複製せず、報酬だけをプラン全体の累積値に差し替えて使う
+                new_observation.reward = action_reward
+                reward_observation = new_observation
+                reward_breakdown = self.reward_synthesizer.synthesize(reward_observation, curiosity_signal)
+                # サマリーは反省を新たに組み立てるときだけ必要なので、遅延して作らせる
+                summary_factory = partial(self.result_formatter.build_summary, reward_observation, execution_result)
+                reflection = await self.thinker.areflect(summary_factory, reward_breakdown)
+                self.memory_manager.update(reflection)
 
-            for handler in self.dashboard_handlers:
-                handler(snapshot)
+                snapshot = LoopSnapshot(
+                    tick=new_observation.tick,
+                    observation=reward_observation,
+                    formatted_state=formatted_state,
+                    action_plan=plan,
+                    execution=execution_result,
+                    reward=reward_breakdown,
+                    reflection=reflection,
+                )
+                playbook_updates, ace_events = self._handle_ace(snapshot, playbook_context, now)
+                if ace_events:
+                    events.extend(ace_events)
+                snapshot.events = events
+                snapshot.playbook_updates = playbook_updates
+                if self.playbook_store:
+                    snapshot.playbook_stats = self.playbook_store.stats()
+                if on_snapshot is not None:
+                    on_snapshot(snapshot)
+                else:
+                    snapshots.append(snapshot)
 
-            observation = new_observation
-            previous_unknown = observation.data.get("unknown", 0.0)
+                for handler in self.sync_dashboard_handlers:
+                    handler(snapshot)
+                if publisher is not None:
+                    # 完了済みの配信は毎ティック回収し、滞留が上限に達したら最も古い配信を待つ
+                    # (配信で起きた例外はここで呼び出し元に伝わる)
+                    while pending_publishes and (
+                        pending_publishes[0].done() or len(pending_publishes) >= MAX_PENDING_PUBLISHES
+                    ):
+                        await pending_publishes.popleft()
+                    pending_publishes.append(event_loop.run_in_executor(publisher, self._publish, snapshot))
 
-            if tick_delay > 0 and not observation.done:
-                time.sleep(tick_delay)
+                observation = new_observation
+                previous_unknown = unknown_now
 
-            if observation.done:
-                break
+                if tick_delay > 0 and not observation.done:
+                    await asyncio.sleep(tick_delay)
+
+                if observation.done:
+                    break
+
+            while pending_publishes:
+                await pending_publishes.popleft()
+        finally:
+            # 途中で止まった場合は未着手の配信を取り消し、完了済みの例外も回収しておく
+            for future in pending_publishes:
+                if not future.cancel() and not future.cancelled():
+                    future.exception()
+            if publisher is not None:
+                publisher.shutdown(wait=True)
 
         return snapshots
 
-    def attach_dashboard(self, handler: DashboardPublisher):
-        self.dashboard_handlers.append(handler)
+    def attach_dashboard(self, handler: DashboardPublisher, sync: bool = False):
+        """Register a handler; ``sync=True`` runs it inside the tick instead of on the publisher thread."""
+        if sync:
+            self.sync_dashboard_handlers.append(handler)
+        else:
+            self.dashboard_handlers.append(handler)
+
+    def _publish(self, snapshot: LoopSnapshot):
+        for handler in self.dashboard_handlers:
+            handler(snapshot)
 
     def _handle_ace(
         self,
         snapshot: LoopSnapshot,
         playbook_context: List[str],
+        now: datetime,
     ) -> Tuple[List[Dict[str, Any]], List[ExecutionEvent]]:
         if not (
             self.config.ace.enabled
@@ -132,64 +205,63 @@ class FeedbackLoop:
         updates: List[Dict[str, Any]] = []
         events: List[ExecutionEvent] = []
 
-        if result.rejected:
-            for item in result.rejected:
-                events.append(
-                    ExecutionEvent(
-                        timestamp=datetime.utcnow(),
-                        channel=Channel.EVENTS,
-                        payload={
-                            "level": "warn",
-                            "message": f"Playbook delta rejected: {item.delta.target}",
-                            "reason": item.reason,
-                            "tick": snapshot.tick,
-                        },
-                    )
-                )
-                updates.append(
-                    {
-                        "target": item.delta.target,
-                        "change_type": item.delta.change_type,
-                        "status": "rejected",
+        tick = snapshot.tick
+        for item in result.rejected:
+            events.append(
+                ExecutionEvent(
+                    timestamp=now,
+                    channel=Channel.EVENTS,
+                    payload={
+                        "level": "warn",
+                        "message": f"Playbook delta rejected: {item.delta.target}",
                         "reason": item.reason,
-                        "content": item.delta.content,
-                        "priority": item.delta.priority,
-                        "tags": item.delta.tags,
-                    }
+                        "tick": tick,
+                    },
                 )
+            )
+            updates.append(item.to_dict())
 
         if result.accepted:
-            applied, applied_events = self.playbook_store.apply_deltas(result.accepted, snapshot.tick)
+            applied, applied_events = self.playbook_store.apply_deltas(result.accepted, tick)
             updates.extend(record.to_dict() for record in applied)
             events.extend(applied_events)
 
-        if (
-            self.config.ace.refine_interval
-            and self.config.ace.refine_interval > 0
-            and snapshot.tick % self.config.ace.refine_interval == 0
-        ):
-            events.append(self.playbook_store.refine(note=f"tick {snapshot.tick}"))
+        refine_interval = self.config.ace.refine_interval
+        if refine_interval and refine_interval > 0 and tick % refine_interval == 0:
+            events.append(self.playbook_store.refine(note=f"tick {tick}"))
 
         return updates, events
 
     @staticmethod
-    def _observation_events(observations: List[Observation]) -> List[ExecutionEvent]:
+    def _observation_events(observations: List[Observation], now: datetime) -> List[ExecutionEvent]:
         timeline: List[ExecutionEvent] = []
+        state = Channel.STATE
         for obs in observations:
-            messages = obs.data.get("events") or []
-            for message in messages:
-                timeline.append(
+            data = obs.data
+            messages = data.get("events") or ()
+            if not messages:
+                continue
+            # 同じステップのメッセージは状態値を共有するので、観測ごとに一度だけ読む
+            tick = obs.tick
+            life = data.get("life")
+            resources = data.get("resources")
+            danger = data.get("danger")
+            unknown = data.get("unknown")
+            timeline.extend(
+                [
                     ExecutionEvent(
-                        timestamp=datetime.utcnow(),
-                        channel=Channel.STATE,
+                        timestamp=now,
+                        channel=state,
                         payload={
-                            "tick": obs.tick,
+                            "tick": tick,
                             "message": message,
-                            "life": obs.data.get("life"),
-                            "resources": obs.data.get("resources"),
-                            "danger": obs.data.get("danger"),
-                            "unknown": obs.data.get("unknown"),
+                            "life": life,
+                            "resources": resources,
+                            "danger": danger,
+                            "unknown": unknown,
                         },
                     )
-                )
+                    for message in messages
+                ]
+            )
         return timeline
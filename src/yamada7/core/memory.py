@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import atexit
+import queue
+import threading
 from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Deque, Dict, Iterable, List
+from typing import IO, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
 from .models import Observation, Reflection
 
@@ -16,6 +19,12 @@ class MemoryManager:
     max_entries: int = 200
     _alert_log: Deque[str] = field(default_factory=lambda: deque(maxlen=200))
     _explore_log: Deque[str] = field(default_factory=lambda: deque(maxlen=200))
+    _export_cache: Optional[Dict[str, List[str]]] = field(default=None, init=False, repr=False)
+    _writer_queue: "queue.Queue[Optional[Tuple[str, bytes]]]" = field(default_factory=queue.Queue, init=False, repr=False)
+    _writer_thread: Optional[threading.Thread] = field(default=None, init=False, repr=False)
+    _opened_files: Set[str] = field(default_factory=set, init=False, repr=False)
+    _persisted_files: Set[str] = field(default_factory=set, init=False, repr=False)
+    _writer_error: Optional[BaseException] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
         self.root.mkdir(parents=True, exist_ok=True)
@@ -32,16 +41,94 @@ class MemoryManager:
         return highlights[: self.max_entries]
 
     def update(self, reflection: Reflection):
+        if reflection.fear_updates or reflection.curiosity_updates:
+            # ログが実際に変わったときだけ export のキャッシュを捨てる
+            self._export_cache = None
         for note in reflection.fear_updates:
             self._alert_log.append(note)
         for note in reflection.curiosity_updates:
             self._explore_log.append(note)
-        self._persist("alert.log", self._alert_log)
-        self._persist("explore.log", self._explore_log)
+        self._persist("alert.log", reflection.fear_updates)
+        self._persist("explore.log", reflection.curiosity_updates)
 
-    def _persist(self, name: str, data: Iterable[str]):
-        path = self.root / name
-        path.write_text("\n".join(data), encoding="utf-8")
+    def flush(self):
+        """Block until every queued note has been written to disk."""
+        if self._writer_thread is not None:
+            self._writer_queue.join()
+        self._raise_writer_error()
+
+    def close(self):
+        thread = self._writer_thread
+        if thread is not None:
+            self._writer_thread = None
+            atexit.unregister(self.close)
+            self._writer_queue.put(None)
+            thread.join()
+        self._raise_writer_error()
+
+    def _raise_writer_error(self):
+        # 書き込みスレッドで起きた例外は、次の _persist / flush / close で呼び出し元に伝える
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise error
+
+    def _persist(self, name: str, notes: Iterable[str]):
+        self._raise_writer_error()
+        # ログ全体を書き直さず、今回追加された分だけを書き込みスレッドへ渡す。
+        # ただし各ファイルの初回は空でも渡し、前回実行分のログを必ず切り詰めさせる
+        chunk = "".join(f"{note}\n" for note in notes)
+        if not chunk and name in self._persisted_files:
+            return
+        self._persisted_files.add(name)
+        if self._writer_thread is None:
+            self._writer_thread = threading.Thread(target=self._write_loop, name="yamada7-memory-writer", daemon=True)
+            self._writer_thread.start()
+            atexit.register(self.close)
+        self._writer_queue.put_nowait((name, chunk.encode("utf-8")))
+
+    def _write_loop(self):
+        handles: Dict[str, IO[bytes]] = {}
+        try:
+            while True:
+                item = self._writer_queue.get()
+                # 溜まっている分をまとめて取り出し、ファイルごとに 1 回の write にする
+                batch = [item]
+                while item is not None:
+                    try:
+                        item = self._writer_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                stop = batch[-1] is None
+                chunks: Dict[str, List[bytes]] = {}
+                for entry in batch:
+                    if entry is not None:
+                        chunks.setdefault(entry[0], []).append(entry[1])
+                try:
+                    for name, parts in chunks.items():
+                        handle = handles.get(name)
+                        if handle is None:
+                            # 最初の書き込みで前回実行分を切り詰め、以降は開いたままのハンドルへ追記する
+                            mode = "ab" if name in self._opened_files else "wb"
+                            handle = handles[name] = (self.root / name).open(mode)
+                            self._opened_files.add(name)
+                        handle.write(b"".join(parts))
+                        handle.flush()
+                except Exception as exc:
+                    # スレッドは止めずに最初の例外だけを残す (flush が待ち続けないよう task_done は必ず呼ぶ)
+                    if self._writer_error is None:
+                        self._writer_error = exc
+                finally:
+                    for _ in batch:
+                        self._writer_queue.task_done()
+                if stop:
+                    return
+        finally:
+            for handle in handles.values():
+                handle.close()
 
     def export(self) -> Dict[str, List[str]]:
-        return {"alert": list(self._alert_log), "exploration": list(self._explore_log)}
+        """Return the alert/exploration logs; the dict is shared between calls and must not be mutated."""
+        if self._export_cache is None:
+            self._export_cache = {"alert": list(self._alert_log), "exploration": list(self._explore_log)}
+        return self._export_cache
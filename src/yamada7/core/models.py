@@ -14,7 +14,7 @@ class Channel(str, Enum):
     LOGS = "logs"
 
 
-@dataclass
+@dataclass(slots=True)
 class Observation:
     """Raw observation received from the environment."""
 
@@ -25,7 +25,7 @@ class Observation:
     info: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class FormattedState:
     """LLM-ready representation of the current situation."""
 
@@ -34,7 +34,7 @@ class FormattedState:
     memory_highlights: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionCandidate:
     """Potential action emitted from the LLM planner."""
 
@@ -44,7 +44,7 @@ class ActionCandidate:
     risk_estimate: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionPlan:
     """Executable plan for the upcoming turn."""
 
@@ -54,7 +54,7 @@ class ActionPlan:
     notes: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionEvent:
     """Single execution event for dashboard/logging."""
 
@@ -63,7 +63,7 @@ class ExecutionEvent:
     payload: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result of executing an action plan."""
 
@@ -73,7 +73,7 @@ class ExecutionResult:
     interrupted: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Reflection:
     """LLM generated reflection after observing results."""
 
@@ -83,7 +83,7 @@ class Reflection:
     next_bias: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class RewardBreakdown:
     """Detailed information about reward synthesis."""
 
@@ -92,7 +92,7 @@ class RewardBreakdown:
     components: Dict[str, float]
 
 
-@dataclass
+@dataclass(slots=True)
 class LoopSnapshot:
     """Snapshot of all key data for a single loop iteration."""
 
@@ -5,6 +5,8 @@ from typing import Dict, List
 
 from .models import ExecutionResult, Observation
 
+_STATE_CHANGE_TEMPLATE = "life=%s, resources=%s, dang=%s, unknown=%s"
+
 
 @dataclass
 class ResultFormatter:
@@ -33,9 +35,5 @@ class ResultFormatter:
 
     @staticmethod
     def _format_state_change(observation: Observation) -> str:
-        data = observation.data
-        return (
-            f"life={data.get('life')}, resources={data.get('resources')}, "
-            f"dang={data.get('danger')}, unknown={data.get('unknown')}"
-        )
-
+        get = observation.data.get
+        return _STATE_CHANGE_TEMPLATE % (get("life"), get("resources"), get("danger"), get("unknown"))
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Mapping
+from typing import Any, Dict, List
 
 from .models import FormattedState, Observation
 
+_SUMMARY_TEMPLATE = "Tick %s: life=%s, dang=%s, resources=%s, unknown=%s."
+
 
 @dataclass
 class StateFormatter:
@@ -13,24 +15,25 @@ class StateFormatter:
     max_slot_items: int = 5
 
     def format(self, observation: Observation, memory_highlights: List[str]) -> FormattedState:
-        data = observation.data
-        slots: Mapping[str, str] = {
-            "tick": observation.tick,
-            "life": data.get("life"),
-            "resources": data.get("resources"),
-            "danger": data.get("danger"),
-            "unknown": data.get("unknown"),
-            "recent_events": self._join(data.get("events", [])),
+        get = observation.data.get
+        tick = observation.tick
+        life = get("life")
+        resources = get("resources")
+        danger = get("danger")
+        unknown = get("unknown")
+        slots: Dict[str, Any] = {
+            "tick": tick,
+            "life": life,
+            "resources": resources,
+            "danger": danger,
+            "unknown": unknown,
+            "recent_events": self._join(get("events", [])),
         }
 
-        summary = (
-            f"Tick {observation.tick}: life={data.get('life')}, "
-            f"dang={data.get('danger')}, resources={data.get('resources')}, "
-            f"unknown={data.get('unknown')}."
-        )
+        summary = _SUMMARY_TEMPLATE % (tick, life, danger, resources, unknown)
 
         trimmed_highlights = memory_highlights[: self.max_slot_items]
-        return FormattedState(summary=summary, slots=dict(slots), memory_highlights=trimmed_highlights)
+        return FormattedState(summary=summary, slots=slots, memory_highlights=trimmed_highlights)
 
     @staticmethod
     def _join(items):
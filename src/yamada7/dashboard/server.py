@@ -1,28 +1,233 @@
 from __future__ import annotations
 
+import math
 import threading
+from array import array
 from collections import deque
-from dataclasses import asdict, dataclass, field
-import json
+from itertools import islice
+from dataclasses import dataclass, field
 import asyncio
-from datetime import datetime
 from pathlib import Path
-from typing import Deque, Dict, List
+from typing import Any, Deque, Dict, List, Optional
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from ..config import LoopConfig, DEFAULT_CONFIG
-from ..core.models import ExecutionEvent, LoopSnapshot
+from ..core import jsonio
+from ..core.models import Channel, ExecutionEvent, LoopSnapshot
 
 
 def _snapshot_to_dict(snapshot: LoopSnapshot) -> Dict:
-    payload = asdict(snapshot)
-    # dataclasses.asdict converts datetimes to iso automatically when str() is called by FastAPI response
-    return payload
+    # asdict は入れ子のデータクラスと dict を再帰的に deepcopy するため、
+    # 同じ構造を属性の直接参照で組み立てる (data などの中身は共有する)
+    observation = snapshot.observation
+    formatted_state = snapshot.formatted_state
+    plan = snapshot.action_plan
+    execution = snapshot.execution
+    reward = snapshot.reward
+    reflection = snapshot.reflection
+    return {
+        "tick": snapshot.tick,
+        "observation": {
+            "tick": observation.tick,
+            "data": observation.data,
+            "reward": observation.reward,
+            "done": observation.done,
+            "info": observation.info,
+        },
+        "formatted_state": {
+            "summary": formatted_state.summary,
+            "slots": formatted_state.slots,
+            "memory_highlights": formatted_state.memory_highlights,
+        },
+        "action_plan": {
+            "intent": plan.intent,
+            "sub_goals": plan.sub_goals,
+            "actions": [
+                {
+                    "action_id": action.action_id,
+                    "parameters": action.parameters,
+                    "confidence": action.confidence,
+                    "risk_estimate": action.risk_estimate,
+                }
+                for action in plan.actions
+            ],
+            "notes": plan.notes,
+        },
+        "execution": {
+            "successes": execution.successes,
+            "failures": execution.failures,
+            "warnings": execution.warnings,
+            "interrupted": execution.interrupted,
+        },
+        "reward": {
+            "external_reward": reward.external_reward,
+            "internal_reward": reward.internal_reward,
+            "components": reward.components,
+        },
+        "reflection": {
+            "summary": reflection.summary,
+            "fear_updates": reflection.fear_updates,
+            "curiosity_updates": reflection.curiosity_updates,
+            "next_bias": reflection.next_bias,
+        },
+        "events": [_event_to_dict(event) for event in snapshot.events],
+        "playbook_updates": snapshot.playbook_updates,
+        "playbook_stats": snapshot.playbook_stats,
+    }
+
+
+# 状態値 (環境側で小数第 3 位に丸め済み) は 1/1000 単位の int32、報酬は float32 で保持する
+_STATE_COLUMNS = ("life", "resources", "danger", "unknown")
+_REWARD_COLUMNS = ("reward", "external_reward", "internal_reward")
+_STATE_SCALE = 1000
+_MISSING_STATE = -(2**31)
+_REWARD_DIGITS = 6
+
+
+_STATE_LIMIT = 2**31 - 1
+
+
+def _to_state_column(value: Any) -> int:
+    # 数値でない値・NaN/inf・int32 に収まらない値は欠損扱いにし、配信を止めない
+    if value is None:
+        return _MISSING_STATE
+    try:
+        scaled = float(value) * _STATE_SCALE
+    except (TypeError, ValueError):
+        return _MISSING_STATE
+    if not -_STATE_LIMIT <= scaled <= _STATE_LIMIT:  # NaN もここで弾かれる
+        return _MISSING_STATE
+    return round(scaled)
+
+
+def _from_state_column(value: int) -> Optional[float]:
+    return None if value == _MISSING_STATE else value / _STATE_SCALE
+
+
+def _to_reward_column(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _from_reward_column(value: float) -> Optional[float]:
+    # float32 の誤差 (例: -0.05 -> -0.05000000074505806) を JSON に出さないよう丸めて戻す
+    # (float32 に収まらず inf になった値も、欠損と同じく None で返す)
+    return round(value, _REWARD_DIGITS) if math.isfinite(value) else None
+
+
+class _MetricsRing:
+    """タイムライン指標を列ごとの固定長配列 (SoA) で保持するリングバッファ。
+
+    状態値は array('i') (1/1000 単位)、報酬は array('f') に書き込み、dict は
+    /metrics の要求時にだけ組み立てる。値が無い (None) か列に収まらない指標は
+    状態値なら _MISSING_STATE、報酬なら NaN として保持する。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ticks = array("i", bytes(4 * capacity))
+        self._states = {name: array("i", bytes(4 * capacity)) for name in _STATE_COLUMNS}
+        self._rewards = {name: array("f", bytes(4 * capacity)) for name in _REWARD_COLUMNS}
+        self._fear_notes: List[str] = [""] * capacity
+        self._curiosity_notes: List[str] = [""] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, snapshot: LoopSnapshot):
+        obs = snapshot.observation.data
+        reward = snapshot.reward
+        reflection = snapshot.reflection
+        external = _to_reward_column(reward.external_reward)
+        internal = _to_reward_column(reward.internal_reward)
+        rewards = (external + internal, external, internal)
+        # 変換は書き込み前に済ませ、途中で失敗して行が半端に更新されることがないようにする
+        states = [_to_state_column(obs.get(name)) for name in _STATE_COLUMNS]
+        with self._lock:
+            row = self._next
+            self._ticks[row] = snapshot.tick
+            for name, value in zip(_STATE_COLUMNS, states):
+                self._states[name][row] = value
+            for name, value in zip(_REWARD_COLUMNS, rewards):
+                self._rewards[name][row] = value
+            self._fear_notes[row] = reflection.fear_updates[-1] if reflection.fear_updates else ""
+            self._curiosity_notes[row] = reflection.curiosity_updates[-1] if reflection.curiosity_updates else ""
+            self._next = (row + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def tail(self, limit: int) -> List[Dict]:
+        with self._lock:
+            count = min(limit, self._size)
+            start = (self._next - count) % self.capacity
+            rows = [(start + offset) % self.capacity for offset in range(count)]
+            states = self._states
+            rewards = self._rewards
+            return [
+                {
+                    "tick": self._ticks[row],
+                    **{name: _from_state_column(states[name][row]) for name in _STATE_COLUMNS},
+                    **{name: _from_reward_column(rewards[name][row]) for name in _REWARD_COLUMNS},
+                    "fear_note": self._fear_notes[row],
+                    "curiosity_note": self._curiosity_notes[row],
+                }
+                for row in rows
+            ]
+
+
+_CHANNELS = tuple(channel.value for channel in Channel)
+_CHANNEL_CODES = {value: code for code, value in enumerate(_CHANNELS)}
+
+
+class _EventRing:
+    """イベントを列ごと (時刻・チャネル番号・payload) に保持するリングバッファ。"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._timestamps: List[str] = [""] * capacity
+        self._channels = array("B", bytes(capacity))
+        self._payloads: List[Optional[Dict]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, events: List[Dict]):
+        """_event_to_dict 済みのイベントを追加する (payload は複製せずに共有する)。"""
+        with self._lock:
+            row = self._next
+            for event in events:
+                self._timestamps[row] = event["timestamp"]
+                self._channels[row] = _CHANNEL_CODES[event["channel"]]
+                self._payloads[row] = event["payload"]
+                row = (row + 1) % self.capacity
+            self._next = row
+            self._size = min(self._size + len(events), self.capacity)
+
+    def tail(self, limit: int) -> List[Dict]:
+        with self._lock:
+            count = min(limit, self._size)
+            start = (self._next - count) % self.capacity
+            rows = [(start + offset) % self.capacity for offset in range(count)]
+            return [
+                {
+                    "timestamp": self._timestamps[row],
+                    "channel": _CHANNELS[self._channels[row]],
+                    "payload": self._payloads[row],
+                }
+                for row in rows
+            ]
 
 
 @dataclass
@@ -33,14 +238,15 @@ class DashboardServer:
     buffer_size: int = 512
     app: FastAPI = field(init=False)
     _snapshots: Deque[Dict] = field(init=False)
-    _timeline: Deque[Dict] = field(init=False)
-    _events: Deque[Dict] = field(init=False)
+    _timeline: _MetricsRing = field(init=False)
+    _events: _EventRing = field(init=False)
+    _snapshots_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
     _thread: threading.Thread | None = field(default=None, init=False)
 
     def __post_init__(self):
         self._snapshots = deque(maxlen=self.buffer_size)
-        self._timeline = deque(maxlen=self.buffer_size)
-        self._events = deque(maxlen=self.buffer_size)
+        self._timeline = _MetricsRing(self.buffer_size)
+        self._events = _EventRing(self.buffer_size)
         self.app = FastAPI(title="yamada7 dashboard", version="0.1.0")
         self.app.add_middleware(
             CORSMiddleware,
@@ -69,26 +275,27 @@ class DashboardServer:
         @self.app.get("/snapshots")
         def snapshots(limit: int = 50):
             limit = max(1, min(limit, self.buffer_size))
-            items = list(self._snapshots)[-limit:]
-            return {"items": items}
+            with self._snapshots_lock:
+                items = _tail(self._snapshots, limit)
+            return _json_response({"items": items})
 
         @self.app.get("/metrics")
         def metrics(limit: int = 200):
             limit = max(1, min(limit, self.buffer_size))
-            items = list(self._timeline)[-limit:]
-            return {"items": items}
+            items = self._timeline.tail(limit)
+            return _json_response({"items": items})
 
         @self.app.get("/events")
         def events(limit: int = 200):
             limit = max(1, min(limit, self.buffer_size))
-            items = list(self._events)[-limit:]
-            return {"items": items}
+            items = self._events.tail(limit)
+            return _json_response({"items": items})
 
         @self.app.get("/latest")
         def latest():
             if not self._snapshots:
-                return {"item": None}
-            return {"item": self._snapshots[-1]}
+                return _json_response({"item": None})
+            return _json_response({"item": self._snapshots[-1]})
 
         @self.app.get("/sse/timeline")
         async def sse_timeline():
@@ -107,10 +314,12 @@ class DashboardServer:
 
     def publisher(self) -> callable:
         def _inner(snapshot: LoopSnapshot):
-            self._snapshots.append(_snapshot_to_dict(snapshot))
-            self._timeline.append(self._extract_metrics(snapshot))
-            for event in snapshot.events:
-                self._events.append(_event_to_dict(event))
+            payload = _snapshot_to_dict(snapshot)
+            self._timeline.append(snapshot)
+            with self._snapshots_lock:
+                self._snapshots.append(payload)
+            # スナップショット用に変換済みのイベントをそのまま使い、二重に変換しない
+            self._events.extend(payload["events"])
 
         return _inner
 
@@ -131,22 +340,17 @@ class DashboardServer:
         self._thread = threading.Thread(target=_target, daemon=True)
         self._thread.start()
 
-    @staticmethod
-    def _extract_metrics(snapshot: LoopSnapshot) -> Dict:
-        obs = snapshot.observation.data
-        reward_total = snapshot.reward.external_reward + snapshot.reward.internal_reward
-        return {
-            "tick": snapshot.tick,
-            "life": obs.get("life"),
-            "resources": obs.get("resources"),
-            "danger": obs.get("danger"),
-            "unknown": obs.get("unknown"),
-            "reward": reward_total,
-            "external_reward": snapshot.reward.external_reward,
-            "internal_reward": snapshot.reward.internal_reward,
-            "fear_note": snapshot.reflection.fear_updates[-1] if snapshot.reflection.fear_updates else "",
-            "curiosity_note": snapshot.reflection.curiosity_updates[-1] if snapshot.reflection.curiosity_updates else "",
-        }
+
+def _json_response(payload: Dict) -> Response:
+    # FastAPI の jsonable_encoder + json.dumps を通さず、orjson (あれば) で直接エンコードする
+    return Response(content=jsonio.dumps_bytes(payload), media_type="application/json")
+
+
+def _tail(buffer: Deque[Dict], limit: int) -> List[Dict]:
+    # 末尾から limit 件だけをたどり、バッファ全体を list に展開しない
+    items = list(islice(reversed(buffer), limit))
+    items.reverse()
+    return items
 
 
 def _event_to_dict(event: ExecutionEvent) -> Dict:
@@ -158,10 +362,4 @@ def _event_to_dict(event: ExecutionEvent) -> Dict:
 
 
 def _format_sse(event_name: str, payload: Dict) -> str:
-    return f"event: {event_name}\ndata: {json.dumps(payload, ensure_ascii=False, default=_json_default)}\n\n"
-
-
-def _json_default(value):
-    if isinstance(value, datetime):
-        return value.isoformat()
-    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+    return f"event: {event_name}\ndata: {jsonio.dumps(payload)}\n\n"
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 from ..core.models import Observation
 from .base import Environment
@@ -10,6 +10,15 @@ from .base import Environment
 
 Coord = Tuple[int, int]
 
+_MOVE_DELTAS: Dict[str, Coord] = {
+    "move_north": (0, -1),
+    "move_south": (0, 1),
+    "move_east": (1, 0),
+    "move_west": (-1, 0),
+}
+
+ACTION_SCHEMA: Tuple[str, ...] = ("move_north", "move_south", "move_east", "move_west", "gather", "wait")
+
 
 @dataclass
 class GridWorldEnvironment(Environment):
@@ -27,58 +36,111 @@ class GridWorldEnvironment(Environment):
     move_cost: float = -0.01
 
     rng: random.Random = field(init=False)
-    agent_pos: Coord = field(init=False)
+    # エージェントの位置はタプルを作り直さないよう 2 つの int で持つ
+    ax: int = field(default=0, init=False)
+    ay: int = field(default=0, init=False)
     tick: int = field(default=0, init=False)
     life: float = field(init=False)
     resources: float = field(default=0.0, init=False)
-    visited: Set[Coord] = field(default_factory=set, init=False)
-    hazards: Set[Coord] = field(default_factory=set, init=False)
-    resource_tiles: Dict[Coord, float] = field(default_factory=dict, init=False)
+    # 盤面は x * height + y で引く平坦なグリッドで持つ (ハッシュ計算もタプル生成も不要)
+    visited_grid: bytearray = field(default_factory=bytearray, init=False, repr=False)
+    _visited_count: int = field(default=0, init=False, repr=False)
+    hazard_grid: bytearray = field(default_factory=bytearray, init=False, repr=False)
+    resource_grid: List[float] = field(default_factory=list, init=False, repr=False)
+    _hazard_coords: List[Coord] = field(default_factory=list, init=False, repr=False)
+    danger_grid: List[float] = field(default_factory=list, init=False, repr=False)
+    _coords: List[Coord] = field(default_factory=list, init=False, repr=False)
+    # イベント文字列は下流 (状態整形・記憶・ダッシュボード) が毎ステップ読むので、
+    # 遅延生成はせず、毎回同じになる文字列を使い回して f-string の整形を省く
+    _moved_labels: List[str] = field(default_factory=list, init=False, repr=False)
+    _action_labels: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
 
     def __post_init__(self):
         self.rng = random.Random(self.seed)
+        # reset のたびに座標タプルを作り直さないよう、走査順 (x 優先) の一覧を持っておく
+        self._coords = [(x, y) for x in range(self.width) for y in range(self.height)]
+        self._moved_labels = [f"moved to {coord}" for coord in self._coords]
         self.reset()
 
     def reset(self) -> Observation:
-        self.agent_pos = (self.width // 2, self.height // 2)
+        self.ax = self.width // 2
+        self.ay = self.height // 2
         self.tick = 0
         self.life = self.base_life
         self.resources = 0.0
-        self.visited = {self.agent_pos}
-        self.hazards = set()
-        self.resource_tiles = {}
-
-        for x in range(self.width):
-            for y in range(self.height):
-                coord = (x, y)
-                if coord == self.agent_pos:
-                    continue
-                if self.rng.random() < self.hazard_rate:
-                    self.hazards.add(coord)
-                elif self.rng.random() < self.resource_rate:
-                    self.resource_tiles[coord] = round(self.rng.uniform(0.05, 0.2), 3)
+        cells = self.width * self.height
+        self.visited_grid = bytearray(cells)
+        agent_index = self.ax * self.height + self.ay
+        self.visited_grid[agent_index] = 1
+        self._visited_count = 1
+        hazard_grid = bytearray(cells)
+        resource_grid = [0.0] * cells
+        hazard_coords: List[Coord] = []
+
+        # 乱数の消費順は従来と同じに保つ (同じ seed なら同じ盤面になる)
+        draw = self.rng.random
+        uniform = self.rng.uniform
+        hazard_rate = self.hazard_rate
+        resource_rate = self.resource_rate
+        for index, coord in enumerate(self._coords):
+            if index == agent_index:
+                continue
+            if draw() < hazard_rate:
+                hazard_grid[index] = 1
+                hazard_coords.append(coord)
+            elif draw() < resource_rate:
+                resource_grid[index] = round(uniform(0.05, 0.2), 3)
+        self.hazard_grid = hazard_grid
+        self.resource_grid = resource_grid
+        self._hazard_coords = hazard_coords
+        self.danger_grid = self._build_danger_grid()
 
         return self._observe(reward=0.0, events=["reset"], done=False)
 
     @property
-    def action_schema(self) -> Iterable[str]:
-        return ["move_north", "move_south", "move_east", "move_west", "gather", "wait"]
+    def agent_pos(self) -> Coord:
+        return self._coords[self.ax * self.height + self.ay]
+
+    @property
+    def hazards(self) -> Set[Coord]:
+        return set(self._hazard_coords)
+
+    @property
+    def visited(self) -> Set[Coord]:
+        return {coord for coord, seen in zip(self._coords, self.visited_grid) if seen}
+
+    @property
+    def resource_tiles(self) -> Dict[Coord, float]:
+        return {coord: value for coord, value in zip(self._coords, self.resource_grid) if value > 0}
+
+    @property
+    def action_schema(self) -> Tuple[str, ...]:
+        return ACTION_SCHEMA
 
     def step(self, action_id: str, **params) -> Observation:
         self.tick += 1
-        events: List[str] = [f"action={action_id}"]
+        label = self._action_labels.get(action_id)
+        if label is None:
+            label = self._action_labels[action_id] = f"action={action_id}"
+        events: List[str] = [label]
         reward = 0.0
         done = False
 
-        if action_id.startswith("move_"):
-            moved = self._move(action_id)
+        delta = _MOVE_DELTAS.get(action_id)
+        if delta is None and action_id.startswith("move_"):
+            # 未知の move_* は従来どおり西への移動として扱う
+            delta = _MOVE_DELTAS["move_west"]
+        if delta is not None:
+            moved = self._move(delta)
             reward += self.move_cost
             if moved:
-                events.append(f"moved to {self.agent_pos}")
+                events.append(self._moved_labels[self.ax * self.height + self.ay])
             else:
                 events.append("blocked by border")
         elif action_id == "gather":
-            gathered = self.resource_tiles.pop(self.agent_pos, 0.0)
+            index = self.ax * self.height + self.ay
+            gathered = self.resource_grid[index]
+            self.resource_grid[index] = 0.0
             if gathered > 0:
                 self.resources += gathered
                 reward += gathered + self.gather_reward
@@ -93,9 +155,12 @@ class GridWorldEnvironment(Environment):
             reward -= 0.05
             events.append("invalid action")
 
-        self.visited.add(self.agent_pos)
+        position = self.ax * self.height + self.ay
+        if not self.visited_grid[position]:
+            self.visited_grid[position] = 1
+            self._visited_count += 1
         hazard_penalty = 0.0
-        if self.agent_pos in self.hazards:
+        if self.hazard_grid[position]:
             hazard_penalty = self.hazard_damage
             self.life -= hazard_penalty
             reward -= hazard_penalty
@@ -108,44 +173,56 @@ class GridWorldEnvironment(Environment):
         observation = self._observe(reward=reward, events=events, done=done)
         return observation
 
-    def _move(self, action_id: str) -> bool:
-        x, y = self.agent_pos
-        if action_id == "move_north":
-            target = (x, y - 1)
-        elif action_id == "move_south":
-            target = (x, y + 1)
-        elif action_id == "move_east":
-            target = (x + 1, y)
-        else:
-            target = (x - 1, y)
-
-        tx, ty = target
+    def _move(self, delta: Coord) -> bool:
+        tx = self.ax + delta[0]
+        ty = self.ay + delta[1]
         if not (0 <= tx < self.width and 0 <= ty < self.height):
             return False
 
-        self.agent_pos = target
+        self.ax = tx
+        self.ay = ty
         return True
 
     def _observe(self, reward: float, events: List[str], done: bool) -> Observation:
-        unknown_tiles = self.width * self.height - len(self.visited)
-        unknown_ratio = unknown_tiles / (self.width * self.height)
-        danger = 1.0 if self.agent_pos in self.hazards else self._nearest_hazard_distance()
+        cells = self.width * self.height
+        # 訪問済みマス数は初訪問のたびに数えているので、盤面を走査して数え直さない
+        unknown_ratio = (cells - self._visited_count) / cells
+        index = self.ax * self.height + self.ay
+        danger = self.danger_grid[index]
         data = {
             "life": round(self.life, 3),
             "resources": round(self.resources, 3),
             "danger": round(danger, 3),
             "unknown": round(unknown_ratio, 3),
-            "position": self.agent_pos,
+            "position": self._coords[index],
             "events": events,
         }
         return Observation(tick=self.tick, data=data, reward=reward, done=done, info={})
 
-    def _nearest_hazard_distance(self) -> float:
-        if not self.hazards:
-            return 0.0
-        ax, ay = self.agent_pos
-        min_distance = min(abs(ax - hx) + abs(ay - hy) for hx, hy in self.hazards)
-        # Normalize to 0-1 with Manhattan distance
-        max_distance = self.width + self.height
-        return 1.0 - (min_distance / max_distance)
-
+    def _build_danger_grid(self) -> List[float]:
+        """Precompute the danger value of every cell from the Manhattan distance to the nearest hazard."""
+        cells = self.width * self.height
+        if not self._hazard_coords:
+            return [0.0] * cells
+        width, height = self.width, self.height
+        hazard_grid = self.hazard_grid
+        # 2 パスの距離変換。障害物のない格子なので、これで最寄りの危険タイルまでのマンハッタン距離になる
+        far = width + height
+        distance = [0 if hazard_grid[index] else far for index in range(cells)]
+        for x in range(width):
+            for y in range(height):
+                index = x * height + y
+                if x > 0 and distance[index - height] + 1 < distance[index]:
+                    distance[index] = distance[index - height] + 1
+                if y > 0 and distance[index - 1] + 1 < distance[index]:
+                    distance[index] = distance[index - 1] + 1
+        for x in range(width - 1, -1, -1):
+            for y in range(height - 1, -1, -1):
+                index = x * height + y
+                if x < width - 1 and distance[index + height] + 1 < distance[index]:
+                    distance[index] = distance[index + height] + 1
+                if y < height - 1 and distance[index + 1] + 1 < distance[index]:
+                    distance[index] = distance[index + 1] + 1
+        # Normalize to 0-1 with Manhattan distance (危険タイル上は 1.0)
+        max_distance = width + height
+        return [1.0 if hazard_grid[index] else 1.0 - (d / max_distance) for index, d in enumerate(distance)]
@@ -1,4 +1,5 @@
 from .thinker import LLMThinker
 from .claude_cli import ClaudeCodeClient
+from .batch_thinker import BatchingThinker, PlanBatcher
 
-__all__ = ["LLMThinker", "ClaudeCodeClient"]
+__all__ = ["LLMThinker", "ClaudeCodeClient", "BatchingThinker", "PlanBatcher"]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ..core.models import ActionPlan, FormattedState, Reflection, RewardBreakdown
+from .thinker import LLMThinker, SummarySource
+
+DEFAULT_MAX_BATCH = 4
+DEFAULT_MAX_WAIT_MS = 20.0
+
+_PlanRequest = Tuple[LLMThinker, FormattedState, List[str], Dict[str, List[str]], "asyncio.Future[ActionPlan]"]
+
+
+def _env_number(name: str, cast, default):
+    # 環境変数は PlanBatcher の生成時に読み、不正な値なら既定値に戻す (import 時には読まない)
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if math.isfinite(value) else default
+
+
+class PlanBatcher:
+    """
+    複数の FeedbackLoop から同時に届く plan 要求をまとめて捌く共有ワーカー。
+
+    - 最初の要求から max_wait_ms だけ待ち、最大 max_batch 件を 1 バッチとして取り出す
+    - バッチ内の要求は max_batch 本のスレッドで同時に Claude CLI を呼び出す
+    - 既定値は環境変数 YAMADA7_LLM_MAX_BATCH / YAMADA7_LLM_MAX_WAIT_MS で上書きできる
+    """
+
+    def __init__(self, max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        if max_batch is None:
+            max_batch = _env_number("YAMADA7_LLM_MAX_BATCH", int, DEFAULT_MAX_BATCH)
+        if max_wait_ms is None:
+            max_wait_ms = _env_number("YAMADA7_LLM_MAX_WAIT_MS", float, DEFAULT_MAX_WAIT_MS)
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_batch, thread_name_prefix="yamada7-plan")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        thinker: LLMThinker,
+        state: FormattedState,
+        allowed_actions: List[str],
+        memory_blurbs: Dict[str, List[str]],
+    ) -> ActionPlan:
+        self._ensure_worker()
+        future: asyncio.Future[ActionPlan] = asyncio.get_running_loop().create_future()
+        await self._queue.put((thinker, state, allowed_actions, memory_blurbs, future))
+        return await future
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    def _ensure_worker(self):
+        # asyncio.run ごとにイベントループが変わるので、ワーカーもループに合わせて作り直す
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await asyncio.gather(*(self._dispatch(loop, request) for request in batch))
+
+    async def _dispatch(self, loop: asyncio.AbstractEventLoop, request: _PlanRequest):
+        thinker, state, allowed_actions, memory_blurbs, future = request
+        try:
+            plan = await loop.run_in_executor(self._executor, thinker.plan, state, allowed_actions, memory_blurbs)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(plan)
+
+
+@dataclass
+class BatchingThinker:
+    """LLMThinker を包み、plan 要求を共有の PlanBatcher 経由で発行する。"""
+
+    thinker: LLMThinker
+    batcher: PlanBatcher
+
+    def plan(
+        self,
+        state: FormattedState,
+        allowed_actions: List[str],
+        memory_blurbs: Dict[str, List[str]],
+    ) -> ActionPlan:
+        return self.thinker.plan(state, allowed_actions, memory_blurbs)
+
+    def reflect(self, summary: SummarySource, reward: RewardBreakdown) -> Reflection:
+        return self.thinker.reflect(summary, reward)
+
+    async def aplan(
+        self,
+        state: FormattedState,
+        allowed_actions: List[str],
+        memory_blurbs: Dict[str, List[str]],
+    ) -> ActionPlan:
+        if self.thinker.config.mode == "claude-cli" and self.thinker.claude_client:
+            return await self.batcher.submit(self.thinker, state, allowed_actions, memory_blurbs)
+        return await self.thinker.aplan(state, allowed_actions, memory_blurbs)
+
+    async def areflect(self, summary: SummarySource, reward: RewardBreakdown) -> Reflection:
+        return await self.thinker.areflect(summary, reward)
@@ -1,28 +1,119 @@
 from __future__ import annotations
 
 import json
+import os
+import selectors
 import shlex
 import subprocess
 import textwrap
+import threading
+import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..core import jsonio
 from ..core.models import ActionCandidate, ActionPlan, Reflection
 
 
-def _extract_json_blob(text: str) -> str:
-    """Best-effort extraction of the first JSON object present in text."""
+# プロンプトのテンプレートは呼び出しごとに dedent せず、モジュール読み込み時に一度だけ整形する
+_PLAN_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    あなたは自分の生存を最優先するエージェントの頭脳です。
+    現在の状態と利用できるアクション候補、警戒ログ・探査ログ・プレイブック抜粋を渡します。
+    以下のJSON形式のみで回答してください。
+
+    {{
+      "plan": {{
+        "intent": string,
+        "sub_goals": [string],
+        "actions": [
+          {{"action_id": string, "parameters": object, "confidence": number, "risk_estimate": number}}
+        ],
+        "notes": string
+      }},
+      "reflection": {{
+        "summary": string,
+        "fear_updates": [string],
+        "curiosity_updates": [string],
+        "next_bias": {{"risk_tolerance": number, "explore_priority": number}}
+      }}
+    }}
+
+    状態: {state}
+    アクション: {actions}
+    メモ: {memory}
+    """
+).strip()
+
+_DELTA_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    あなたは戦術アナリストです。実行ログと振り返りをもとに、進化するプレイブックへの差分を提案してください。
+    出力は以下のJSON形式のみとし、日本語で簡潔に記述します。
+
+    {
+      "deltas": [
+        {
+          "target": string,
+          "change_type": "add" | "update" | "retire",
+          "content": string,
+          "priority": number,
+          "tags": [string],
+          "evidence": [string]
+        }
+      ]
+    }
+
+    制約:
+    - 「警戒ログ」「探査ログ」「プレイブック」といった表現を使用し、特定の感情語に依存しない。
+    - 事実に基づき、過度な推測は避ける。
+    - 3件以内に収める。
+
+    入力データ:
+    {payload}
+    """
+).strip()
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_blob(text: str) -> Any:
+    """Best-effort decoding of the first JSON object present in text."""
+    # 最初の "{" から raw_decode で 1 オブジェクト分だけ読み、後ろの余計な出力は無視する
     start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return text[start : end + 1]
+    while start != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
     raise ValueError("JSON blob not found in Claude response")
 
 
+def _parse_response(output: str) -> Dict:
+    try:
+        return jsonio.loads(output)
+    except json.JSONDecodeError:
+        return _extract_json_blob(output)
+
+
+_is_str = str.__instancecheck__
+
+
+def _str_entries(values: Any) -> List[str]:
+    # 文字列以外の要素 (と null) を捨てる。判定は C 実装の filter に任せる
+    return list(filter(_is_str, values or ()))
+
+
 def _coerce_float(value: Optional[float], default: float = 0.0) -> float:
+    if value is None:
+        return default
+    # 応答の数値はほぼ int / float なので、文字列などの変換だけを例外処理に回す
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
     try:
-        if value is None:
-            return default
         return float(value)
     except (TypeError, ValueError):
         return default
@@ -37,6 +128,30 @@ class ClaudeCodeClient:
     timeout: int = 90
     extra_args: List[str] = field(default_factory=list)
     skip_permissions: bool = True
+    persistent: bool = False
+    _json_cache: Dict[str, Tuple[Any, str]] = field(default_factory=dict, init=False, repr=False)
+    _proc: Optional[subprocess.Popen] = field(default=None, init=False, repr=False)
+    _proc_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _stream_unsupported: bool = field(default=False, init=False, repr=False)
+    _stream_verified: bool = field(default=False, init=False, repr=False)
+    _stdout_buffer: bytearray = field(default_factory=bytearray, init=False, repr=False)
+
+    def close(self):
+        """Terminate the long-lived CLI process started in persistent mode, if any."""
+        proc, self._proc = self._proc, None
+        self._stdout_buffer.clear()
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    def __del__(self):
+        if getattr(self, "_proc", None) is not None:
+            self.close()
 
     def generate_plan(
         self,
@@ -55,34 +170,12 @@ class ClaudeCodeClient:
         return plan, reflection
 
     def generate_playbook_deltas(self, payload: Dict) -> List[Dict]:
-        prompt = textwrap.dedent(
-            """
-            あなたは戦術アナリストです。実行ログと振り返りをもとに、進化するプレイブックへの差分を提案してください。
-            出力は以下のJSON形式のみとし、日本語で簡潔に記述します。
+        return self.generate_playbook_deltas_json(jsonio.dumps(payload))
 
-            {
-              "deltas": [
-                {
-                  "target": string,
-                  "change_type": "add" | "update" | "retire",
-                  "content": string,
-                  "priority": number,
-                  "tags": [string],
-                  "evidence": [string]
-                }
-              ]
-            }
-
-            制約:
-            - 「警戒ログ」「探査ログ」「プレイブック」といった表現を使用し、特定の感情語に依存しない。
-            - 事実に基づき、過度な推測は避ける。
-            - 3件以内に収める。
-
-            入力データ:
-            {payload}
-            """
-        ).strip()
-        rendered = prompt.format(payload=json.dumps(payload, ensure_ascii=False))
+    def generate_playbook_deltas_json(self, payload_json: str) -> List[Dict]:
+        """Same as generate_playbook_deltas, but takes the payload already encoded as JSON."""
+        # テンプレートに JSON の波括弧を含むため str.format ではなく置換で埋め込む
+        rendered = _DELTA_PROMPT_TEMPLATE.replace("{payload}", payload_json)
         response = self._invoke(rendered) or {}
         deltas = response.get("deltas") if isinstance(response, dict) else []
         if not isinstance(deltas, list):
@@ -108,54 +201,45 @@ class ClaudeCodeClient:
 
     # internal helpers
     def _build_prompt(self, state: Dict, allowed_actions: List[str], memory: Dict[str, List[str]]) -> str:
-        template = textwrap.dedent(
-            """
-            あなたは自分の生存を最優先するエージェントの頭脳です。
-            現在の状態と利用できるアクション候補、警戒ログ・探査ログ・プレイブック抜粋を渡します。
-            以下のJSON形式のみで回答してください。
-
-            {{
-              "plan": {{
-                "intent": string,
-                "sub_goals": [string],
-                "actions": [
-                  {{"action_id": string, "parameters": object, "confidence": number, "risk_estimate": number}}
-                ],
-                "notes": string
-              }},
-              "reflection": {{
-                "summary": string,
-                "fear_updates": [string],
-                "curiosity_updates": [string],
-                "next_bias": {{"risk_tolerance": number, "explore_priority": number}}
-              }}
-            }}
-
-            状態: {state}
-            アクション: {actions}
-            メモ: {memory}
-            """
-        ).strip()
-        rendered = template.format(
-            state=json.dumps(state, ensure_ascii=False),
-            actions=json.dumps(allowed_actions, ensure_ascii=False),
-            memory=json.dumps(memory, ensure_ascii=False),
+        # プロンプトに埋め込む JSON は空白を省いてトークン数を抑える。
+        # jsonio.dumps(memory) と同じ出力で、変化のない値は前回のエンコード結果を使い回す
+        memory_json = ",".join(
+            f"{jsonio.dumps(name)}:{self._dumps_cached('memory.' + name, value)}"
+            for name, value in memory.items()
+        )
+        rendered = _PLAN_PROMPT_TEMPLATE.format(
+            state=jsonio.dumps(state),
+            actions=self._dumps_cached("actions", allowed_actions),
+            memory="{" + memory_json + "}",
         )
         return rendered
 
-    def _invoke(self, prompt: str) -> Optional[Dict]:
-        cmd = [
-            self.binary,
-            "code",
-            "--model",
-            self.model,
-            "--output-format",
-            "json",
-        ]
+    def _dumps_cached(self, key: str, value: Any) -> str:
+        """Encode value, reusing the previous result while the caller keeps passing the same object."""
+        # MemoryManager.export と FeedbackLoop の action_schema は内容が変わらない間は
+        # 同じリストを渡し続ける (どちらも書き換えない前提) ため、同一性だけで判定できる
+        cached = self._json_cache.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        text = jsonio.dumps(value)
+        self._json_cache[key] = (value, text)
+        return text
+
+    def _command(self, *output_args: str) -> List[str]:
+        cmd = [self.binary, "code", "--model", self.model, *output_args]
         if self.skip_permissions:
             cmd.append("--dangerously-skip-permissions")
         if self.extra_args:
             cmd.extend(self.extra_args)
+        return cmd
+
+    def _invoke(self, prompt: str) -> Optional[Dict]:
+        if self.persistent and not self._stream_unsupported:
+            with self._proc_lock:
+                data = self._invoke_persistent(prompt)
+            if data is not None:
+                return data
+        cmd = self._command("--output-format", "json")
 
         try:
             result = subprocess.run(
@@ -176,29 +260,107 @@ class ClaudeCodeClient:
                 f"Claude CLI がエラー終了しました (code={result.returncode}). stderr={result.stderr.strip()}"
             )
 
-        output = result.stdout.strip()
+        return _parse_response(result.stdout.strip())
+
+    def _invoke_persistent(self, prompt: str) -> Optional[Dict]:
+        """
+        起動済みの CLI プロセスへ stream-json で 1 行ずつプロンプトを送り、result 行を待つ。
+
+        - プロセスの起動と解釈系のウォームアップを呼び出しごとに繰り返さずに済む
+        - 応答前にプロセスが終了した場合はストリーミング非対応とみなし、以降は subprocess.run に戻す
+        - result 行より前に入出力やプロトコルが壊れた場合はプロセスを捨て、None を返す
+          (呼び出し側がその回だけ subprocess.run で呼び直す)
+        - result 行を受け取った後は、モデルの回答が解析できなくても呼び直さない
+          (同じプロンプトで LLM を二重に呼ぶことになるため)
+        """
+        proc = self._ensure_proc()
+        if proc is None:
+            return None
+        message = {"type": "user", "message": {"role": "user", "content": prompt}}
         try:
-            data = json.loads(output)
-        except json.JSONDecodeError:
-            blob = _extract_json_blob(output)
-            data = json.loads(blob)
-        return data
+            proc.stdin.write(jsonio.dumps_bytes(message, newline=True))
+            proc.stdin.flush()
+            while True:
+                line = self._read_line(proc)
+                if line is None:
+                    # 一度も応答を返せずに終了した場合だけストリーミング非対応とみなす
+                    self._stream_unsupported = not self._stream_verified
+                    self.close()
+                    return None
+                if not line.strip():
+                    continue
+                event = jsonio.loads(line)
+                if isinstance(event, dict) and event.get("type") == "result":
+                    break
+        except subprocess.TimeoutExpired as exc:
+            # 応答待ちのプロセスは stdin を閉じても終わらないので、待たずに止める
+            proc.kill()
+            self.close()
+            raise RuntimeError("Claude CLI 呼び出しがタイムアウトしました。") from exc
+        except (OSError, ValueError):
+            self.close()
+            return None
+
+        self._stream_verified = True
+        result = event.get("result")
+        if event.get("is_error"):
+            raise RuntimeError(f"Claude CLI がエラーを返しました: {result}")
+        return _parse_response(result.strip()) if isinstance(result, str) else event
+
+    def _ensure_proc(self) -> Optional[subprocess.Popen]:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        cmd = self._command("--input-format", "stream-json", "--output-format", "stream-json", "--verbose")
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError(f"Claude CLI '{shlex.join(cmd)}' が見つかりません。インストールを確認してください。") from exc
+        return self._proc
+
+    def _read_line(self, proc: subprocess.Popen) -> Optional[bytes]:
+        # readline はタイムアウトを指定できないため、select で待ちながら改行までを自前で読む
+        # (1 回の読み込みに複数行が含まれることがあるので、残りは _stdout_buffer に持ち越す)
+        deadline = time.monotonic() + self.timeout
+        buffer = self._stdout_buffer
+        fd = proc.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                newline = buffer.find(b"\n")
+                if newline != -1:
+                    line = bytes(buffer[:newline])
+                    del buffer[: newline + 1]
+                    return line
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise subprocess.TimeoutExpired(proc.args, self.timeout)
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return None
+                buffer.extend(chunk)
 
     @staticmethod
     def _plan_from_dict(data: Dict) -> ActionPlan:
-        actions = []
-        for entry in data.get("actions", []):
-            actions.append(
-                ActionCandidate(
-                    action_id=entry.get("action_id", "wait"),
-                    parameters=entry.get("parameters") or {},
-                    confidence=_coerce_float(entry.get("confidence"), 0.5),
-                    risk_estimate=_coerce_float(entry.get("risk_estimate"), 0.5),
-                )
+        candidate = ActionCandidate
+        coerce = _coerce_float
+        actions = [
+            candidate(
+                action_id=entry.get("action_id", "wait"),
+                parameters=entry.get("parameters") or {},
+                confidence=coerce(entry.get("confidence"), 0.5),
+                risk_estimate=coerce(entry.get("risk_estimate"), 0.5),
             )
+            for entry in data.get("actions", [])
+        ]
         return ActionPlan(
             intent=data.get("intent", "unknown"),
-            sub_goals=list(entry for entry in data.get("sub_goals", []) if isinstance(entry, str)),
+            sub_goals=_str_entries(data.get("sub_goals")),
             actions=actions,
             notes=data.get("notes"),
         )
@@ -208,8 +370,8 @@ class ClaudeCodeClient:
         bias = data.get("next_bias") or {}
         return Reflection(
             summary=data.get("summary", ""),
-            fear_updates=[entry for entry in data.get("fear_updates", []) if isinstance(entry, str)],
-            curiosity_updates=[entry for entry in data.get("curiosity_updates", []) if isinstance(entry, str)],
+            fear_updates=_str_entries(data.get("fear_updates")),
+            curiosity_updates=_str_entries(data.get("curiosity_updates")),
             next_bias={
                 "risk_tolerance": _coerce_float(bias.get("risk_tolerance"), 0.4),
                 "explore_priority": _coerce_float(bias.get("explore_priority"), 0.5),
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import random
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from ..config import LLMConfig
 from ..core.models import ActionCandidate, ActionPlan, FormattedState, Reflection, RewardBreakdown
 from .claude_cli import ClaudeCodeClient
 
+# reflect にはサマリーそのものか、必要になったときに作る関数を渡せる
+SummarySource = Union[Dict[str, List[str]], Callable[[], Dict[str, List[str]]]]
+
 
 @dataclass
 class LLMThinker:
@@ -23,6 +27,8 @@ class LLMThinker:
     claude_client: Optional[ClaudeCodeClient] = None
     rng: random.Random = field(init=False)
     _cached_reflection: Optional[Reflection] = field(default=None, init=False)
+    # (allowed_actions, move_ 系アクション, gather を含むか) を allowed_actions の同一性で使い回す
+    _action_cache: Optional[Tuple[List[str], List[str], bool]] = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
         self.rng = random.Random(self.seed)
@@ -42,13 +48,32 @@ class LLMThinker:
         self._cached_reflection = None
         return plan
 
-    def reflect(self, summary: Dict[str, List[str]], reward: RewardBreakdown) -> Reflection:
+    def reflect(self, summary: SummarySource, reward: RewardBreakdown) -> Reflection:
         if self._cached_reflection:
+            # plan 時に Claude が返した反省を使う場合、サマリーは組み立てない
             reflection = self._cached_reflection
             self._cached_reflection = None
             return reflection
+        if callable(summary):
+            summary = summary()
         return self._heuristic_reflection(summary, reward)
 
+    async def aplan(
+        self,
+        state: FormattedState,
+        allowed_actions: List[str],
+        memory_blurbs: Dict[str, List[str]],
+    ) -> ActionPlan:
+        """plan の awaitable 版。Claude CLI の呼び出しはスレッドに逃がしてイベントループを塞がない。"""
+        if self.config.mode == "claude-cli" and self.claude_client:
+            return await asyncio.to_thread(self.plan, state, allowed_actions, memory_blurbs)
+        # ヒューリスティックは十分軽いのでスレッド切り替えのコストをかけない
+        return self.plan(state, allowed_actions, memory_blurbs)
+
+    async def areflect(self, summary: SummarySource, reward: RewardBreakdown) -> Reflection:
+        """reflect の awaitable 版。反省は plan 時の応答かヒューリスティックから作るため外部呼び出しはない。"""
+        return self.reflect(summary, reward)
+
     # ------------------------------------------------------------------
     # internal helpers
     # ------------------------------------------------------------------
@@ -88,7 +113,7 @@ class LLMThinker:
             sub_goals.append("gather resources")
 
         candidates: List[ActionCandidate] = []
-        move_actions = [a for a in allowed_actions if a.startswith("move_")]
+        move_actions, has_gather = self._classify_actions(allowed_actions)
         if primary_intent == "preserve life" and move_actions:
             candidates.append(
                 ActionCandidate(
@@ -108,7 +133,7 @@ class LLMThinker:
                 )
             )
 
-        if "gather" in allowed_actions:
+        if has_gather:
             candidates.append(
                 ActionCandidate(
                     action_id="gather",
@@ -136,6 +161,14 @@ class LLMThinker:
 
         return ActionPlan(intent=primary_intent, sub_goals=sub_goals, actions=candidates, notes=notes.strip())
 
+    def _classify_actions(self, allowed_actions: List[str]) -> Tuple[List[str], bool]:
+        # FeedbackLoop はエピソード中ずっと同じリストを渡す (書き換えない前提) ため、同一性だけで判定できる
+        cached = self._action_cache
+        if cached is None or cached[0] is not allowed_actions:
+            move_actions = [a for a in allowed_actions if a.startswith("move_")]
+            cached = self._action_cache = (allowed_actions, move_actions, "gather" in allowed_actions)
+        return cached[1], cached[2]
+
     def _heuristic_reflection(self, summary: Dict[str, List[str]], reward: RewardBreakdown) -> Reflection:
         reward_total = reward.external_reward + reward.internal_reward
         if reward_total < -0.1:
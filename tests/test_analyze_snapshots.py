@@ -3,18 +3,22 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from scripts.analyze_snapshots import analyse_files
+import pytest
+
+import scripts.analyze_snapshots as analyze_snapshots
+from scripts.analyze_snapshots import analyse_files, iter_jsonl_lines
 
 
 def create_snapshot_file(path: Path, rewards, targets):
-    with path.open("w", encoding="utf-8") as fh:
-        for reward in rewards:
-            entry = {
-                "reward": {"external": reward, "internal": 0.0},
-                "playbook_updates": [{"target": t, "change_type": "add"} for t in targets],
-                "playbook_stats": {"files": 1, "sections": 2, "characters": 100},
-            }
-            fh.write(json.dumps(entry) + "\n")
+    entries = (
+        {
+            "reward": {"external": reward, "internal": 0.0},
+            "playbook_updates": [{"target": t, "change_type": "add"} for t in targets],
+            "playbook_stats": {"files": 1, "sections": 2, "characters": 100},
+        }
+        for reward in rewards
+    )
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
 
 
 def test_analyse_files(tmp_path):
@@ -26,3 +30,69 @@ def test_analyse_files(tmp_path):
     assert abs(report["average_total_reward"] - (-0.05)) < 1e-6
     assert report["playbook_top_targets"][0][0] == "alert_notes"
     assert report["playbook_stats_latest"]["files"] == 1
+
+
+def test_iter_jsonl_lines_handles_chunk_boundaries(tmp_path):
+    file_path = tmp_path / "episode.jsonl"
+    file_path.write_bytes(b'{"a": 1}\r\n\n{"b": 2}\n{"c": 3}')
+
+    lines = list(iter_jsonl_lines(file_path, chunk_size=4))
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_analyse_files_is_serial_by_default(tmp_path, monkeypatch):
+    def fail_pool(*args, **kwargs):
+        raise AssertionError("analyse_files must not start a process pool unless jobs > 1")
+
+    monkeypatch.setattr(analyze_snapshots.multiprocessing, "Pool", fail_pool)
+    paths = []
+    for index in range(2):
+        path = tmp_path / f"episode{index}.jsonl"
+        create_snapshot_file(path, rewards=[0.1], targets=["alert_notes"])
+        paths.append(path)
+
+    report = analyse_files(paths, top_targets=3)
+    assert report["episodes"] == 2
+
+
+def test_load_projected_matches_full_decode(tmp_path, monkeypatch):
+    pytest.importorskip("ijson")
+    entries = [
+        {
+            "tick": 1,
+            "observation": {"data": {"events": ["x" * 100], "position": [1, 2]}},
+            "reward": {"external": 0.25, "internal": -0.125, "components": {"external": 0.25}},
+            "playbook_updates": [
+                {"target": "alert_notes", "change_type": "add", "tags": ["target"]},
+                {"change_type": "retire", "evidence": [{"target": "nested"}]},
+            ],
+            "playbook_stats": {"files": 2, "sections": 3, "characters": 120, "nested": {"a": [1, 2.5]}},
+        },
+        {
+            "tick": 2,
+            "reward": {"external": 1, "internal": 0.0},
+            "playbook_updates": [],
+            "playbook_stats": None,
+        },
+    ]
+    for entry in entries:
+        line = json.dumps(entry).encode("utf-8")
+        full = json.loads(line)
+        projected = analyze_snapshots.load_projected(line)
+        assert projected["reward"] == {key: full["reward"][key] for key in ("external", "internal")}
+        assert [u.get("target") for u in projected["playbook_updates"]] == [
+            u.get("target") for u in full["playbook_updates"]
+        ]
+        assert projected["playbook_stats"] == full["playbook_stats"]
+
+    file_path = tmp_path / "episode.jsonl"
+    file_path.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+    expected = analyze_snapshots._analyse_one(file_path)
+    monkeypatch.setattr(analyze_snapshots, "USE_PROJECTION", True)
+    monkeypatch.setattr(analyze_snapshots, "PROJECTION_THRESHOLD", 0)
+    assert analyze_snapshots._analyse_one(file_path) == expected
+
+
+def test_projection_requires_c_backend():
+    ijson = pytest.importorskip("ijson")
+    assert analyze_snapshots.USE_PROJECTION == (ijson.backend in {"yajl2_c", "yajl2_cffi"})
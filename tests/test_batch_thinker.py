@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from yamada7.core.models import ActionPlan, FormattedState
+from yamada7.llm.batch_thinker import DEFAULT_MAX_BATCH, DEFAULT_MAX_WAIT_MS, PlanBatcher
+
+STATE = FormattedState(summary="", slots={})
+
+
+class FakeThinker:
+    def __init__(self, barrier=None, error=None):
+        self.barrier = barrier
+        self.error = error
+        self.calls = 0
+
+    def plan(self, state, allowed_actions, memory_blurbs):
+        self.calls += 1
+        if self.barrier is not None:
+            # バッチ内の要求が同時に走っていなければここで BrokenBarrierError になる
+            self.barrier.wait()
+        if self.error is not None:
+            raise self.error
+        return ActionPlan(intent=f"plan-{threading.current_thread().name}", sub_goals=[], actions=[])
+
+
+async def submit_many(batcher: PlanBatcher, thinkers):
+    return await asyncio.gather(
+        *(batcher.submit(thinker, STATE, ["wait"], {}) for thinker in thinkers),
+        return_exceptions=True,
+    )
+
+
+def test_full_batch_is_dispatched_concurrently_without_waiting():
+    batcher = PlanBatcher(max_batch=3, max_wait_ms=5000)
+    barrier = threading.Barrier(3, timeout=2)
+    try:
+        started = time.monotonic()
+        plans = asyncio.run(submit_many(batcher, [FakeThinker(barrier) for _ in range(3)]))
+        elapsed = time.monotonic() - started
+    finally:
+        batcher.close()
+    assert all(isinstance(plan, ActionPlan) for plan in plans)
+    assert len({plan.intent for plan in plans}) == 3
+    assert elapsed < 1.0
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    batcher = PlanBatcher(max_batch=4, max_wait_ms=50)
+    try:
+        started = time.monotonic()
+        (plan,) = asyncio.run(submit_many(batcher, [FakeThinker()]))
+        elapsed = time.monotonic() - started
+    finally:
+        batcher.close()
+    assert isinstance(plan, ActionPlan)
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_exception_reaches_every_waiter():
+    batcher = PlanBatcher(max_batch=3, max_wait_ms=50)
+    error = RuntimeError("cli failed")
+    thinkers = [FakeThinker(error=error) for _ in range(3)]
+    try:
+        results = asyncio.run(submit_many(batcher, thinkers))
+    finally:
+        batcher.close()
+    assert results == [error, error, error]
+    assert [thinker.calls for thinker in thinkers] == [1, 1, 1]
+
+
+def test_invalid_environment_falls_back_to_defaults(monkeypatch):
+    monkeypatch.setenv("YAMADA7_LLM_MAX_BATCH", "many")
+    monkeypatch.setenv("YAMADA7_LLM_MAX_WAIT_MS", "nan")
+    batcher = PlanBatcher()
+    batcher.close()
+    assert batcher.max_batch == DEFAULT_MAX_BATCH
+    assert batcher.max_wait == pytest.approx(DEFAULT_MAX_WAIT_MS / 1000.0)
+
+
+def test_environment_overrides_defaults(monkeypatch):
+    monkeypatch.setenv("YAMADA7_LLM_MAX_BATCH", "2")
+    monkeypatch.setenv("YAMADA7_LLM_MAX_WAIT_MS", "5")
+    batcher = PlanBatcher()
+    batcher.close()
+    assert batcher.max_batch == 2
+    assert batcher.max_wait == pytest.approx(0.005)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from yamada7.core.models import ActionPlan
+from yamada7.llm.claude_cli import ClaudeCodeClient
+
+# stream-json を話す偽の Claude CLI。呼ばれ方を calls.log に 1 行ずつ記録する
+FAKE_CLI = textwrap.dedent(
+    """
+    import json, os, sys, time
+
+    mode = os.environ["FAKE_CLAUDE_MODE"]
+    log = os.environ["FAKE_CLAUDE_LOG"]
+    streaming = "stream-json" in sys.argv
+
+    def record(kind):
+        with open(log, "a", encoding="utf-8") as fh:
+            fh.write(kind + "\\n")
+
+    def plan_text(intent):
+        return "回答: " + json.dumps({"plan": {"intent": intent, "actions": []}}) + " 以上 }"
+
+    if not streaming:
+        sys.stdin.read()
+        record("oneshot")
+        print(json.dumps({"plan": {"intent": "oneshot", "actions": []}}))
+        sys.exit(0)
+    if mode == "nostream":
+        sys.exit(1)
+
+    out = sys.stdout.buffer
+    for count, line in enumerate(sys.stdin, start=1):
+        record("stream")
+        json.loads(line)
+        if mode == "hang":
+            time.sleep(30)
+        text = "not json at all" if mode == "bad" else plan_text("stream%d" % count)
+        init = json.dumps({"type": "system", "subtype": "init"}).encode()
+        result = json.dumps({"type": "result", "is_error": False, "result": text}).encode()
+        # 1 回の書き込みに複数行を含め、result 行は途中で分割して送る
+        out.write(init + b"\\n\\n" + result[:10])
+        out.flush()
+        time.sleep(0.05)
+        out.write(result[10:] + b"\\n")
+        out.flush()
+    """
+)
+
+
+@pytest.fixture
+def fake_cli(tmp_path: Path, monkeypatch):
+    script = tmp_path / "fake_claude"
+    script.write_text(f"#!{sys.executable}\n" + FAKE_CLI, encoding="utf-8")
+    script.chmod(0o755)
+    log = tmp_path / "calls.log"
+    monkeypatch.setenv("FAKE_CLAUDE_LOG", str(log))
+
+    def make(mode: str, timeout: int = 5) -> ClaudeCodeClient:
+        monkeypatch.setenv("FAKE_CLAUDE_MODE", mode)
+        return ClaudeCodeClient(binary=str(script), timeout=timeout, persistent=True)
+
+    def calls():
+        return log.read_text(encoding="utf-8").split() if log.exists() else []
+
+    make.calls = calls
+    return make
+
+
+def test_persistent_reuses_process_and_buffers_partial_lines(fake_cli):
+    client = fake_cli("ok")
+    try:
+        plans = [client.generate_plan({"tick": 1}, ["wait"], {})[0] for _ in range(3)]
+        assert [plan.intent for plan in plans] == ["stream1", "stream2", "stream3"]
+        assert isinstance(plans[0], ActionPlan)
+        assert fake_cli.calls() == ["stream"] * 3
+    finally:
+        client.close()
+    assert client._proc is None
+
+
+def test_persistent_bad_answer_is_not_resent(fake_cli):
+    client = fake_cli("bad")
+    try:
+        with pytest.raises(ValueError):
+            client.generate_plan({"tick": 1}, ["wait"], {})
+        proc = client._proc
+        assert proc is not None and proc.poll() is None
+        assert fake_cli.calls() == ["stream"]
+    finally:
+        client.close()
+
+
+def test_persistent_falls_back_when_streaming_is_unsupported(fake_cli):
+    client = fake_cli("nostream")
+    plan, _ = client.generate_plan({"tick": 1}, ["wait"], {})
+    assert plan.intent == "oneshot"
+    assert client._stream_unsupported
+    plan, _ = client.generate_plan({"tick": 1}, ["wait"], {})
+    assert plan.intent == "oneshot"
+    assert fake_cli.calls() == ["oneshot", "oneshot"]
+
+
+def test_persistent_timeout_kills_process(fake_cli):
+    client = fake_cli("hang", timeout=1)
+    with pytest.raises(RuntimeError, match="タイムアウト"):
+        client.generate_plan({"tick": 1}, ["wait"], {})
+    assert client._proc is None
+    assert fake_cli.calls() == ["stream"]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from yamada7.core.models import (
+    ActionPlan,
+    Channel,
+    ExecutionEvent,
+    ExecutionResult,
+    FormattedState,
+    LoopSnapshot,
+    Observation,
+    Reflection,
+    RewardBreakdown,
+)
+from yamada7.dashboard.server import DashboardServer, _MISSING_STATE, _to_state_column
+
+
+def make_snapshot(tick: int, **data) -> LoopSnapshot:
+    observation = Observation(tick=tick, data=data, reward=0.0, done=False)
+    return LoopSnapshot(
+        tick=tick,
+        observation=observation,
+        formatted_state=FormattedState(summary="", slots={}, memory_highlights=[]),
+        action_plan=ActionPlan(intent="test", sub_goals=[], actions=[]),
+        execution=ExecutionResult(),
+        reward=RewardBreakdown(external_reward=0.1, internal_reward=0.0, components={}),
+        reflection=Reflection(summary="", fear_updates=[], curiosity_updates=[], next_bias={}),
+        events=[ExecutionEvent(timestamp=datetime(2024, 1, 1), channel=Channel.STATE, payload={"tick": tick})],
+    )
+
+
+def test_state_column_round_trip():
+    assert _to_state_column(0.125) == 125
+    assert _to_state_column(None) == _MISSING_STATE
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_state_column_non_finite_is_missing(value):
+    assert _to_state_column(value) == _MISSING_STATE
+
+
+@pytest.mark.parametrize("value", [2_147_484.0, -2_147_484.0, 10**12])
+def test_state_column_out_of_range_is_missing(value):
+    assert _to_state_column(value) == _MISSING_STATE
+
+
+@pytest.mark.parametrize("value", ["high", object(), [1.0]])
+def test_state_column_non_numeric_is_missing(value):
+    assert _to_state_column(value) == _MISSING_STATE
+
+
+def test_publisher_keeps_buffers_aligned_on_bad_values():
+    server = DashboardServer(buffer_size=8)
+    publish = server.publisher()
+    publish(make_snapshot(1, life=1.0, resources=0.5, danger=0.0, unknown=0.8))
+    publish(make_snapshot(2, life=float("nan"), resources=1e12, danger="high", unknown=0.7))
+
+    assert len(server._snapshots) == len(server._timeline) == len(server._events) == 2
+    latest = server._timeline.tail(1)[0]
+    assert latest["tick"] == 2
+    assert latest["life"] is None
+    assert latest["resources"] is None
+    assert latest["danger"] is None
+    assert latest["unknown"] == 0.7
+
+
+def test_latest_uses_json_response_when_empty():
+    server = DashboardServer(buffer_size=8)
+    latest = next(route.endpoint for route in server.app.routes if getattr(route, "path", None) == "/latest")
+    response = latest()
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"item": None}
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from yamada7.config import LLMConfig
+from yamada7.core import ExecutionEngine, FeedbackLoop, MemoryManager, ResultFormatter, RewardSynthesizer, StateFormatter
+from yamada7.core.loop import MAX_PENDING_PUBLISHES
+from yamada7.env import GridWorldEnvironment
+from yamada7.llm import LLMThinker
+
+
+@pytest.fixture
+def make_loop(tmp_path):
+    managers = []
+
+    def make() -> FeedbackLoop:
+        environment = GridWorldEnvironment(seed=7, hazard_rate=0.0)
+        memory_manager = MemoryManager(root=tmp_path / f"memory{len(managers)}")
+        managers.append(memory_manager)
+        return FeedbackLoop(
+            environment=environment,
+            state_formatter=StateFormatter(),
+            result_formatter=ResultFormatter(),
+            reward_synthesizer=RewardSynthesizer(),
+            memory_manager=memory_manager,
+            execution_engine=ExecutionEngine(allowed_actions=environment.action_schema),
+            thinker=LLMThinker(config=LLMConfig(), seed=3),
+        )
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def test_run_async_matches_run(make_loop):
+    sync_ticks = [snapshot.tick for snapshot in make_loop().run(max_ticks=5)]
+    async_ticks = [snapshot.tick for snapshot in asyncio.run(make_loop().run_async(max_ticks=5))]
+    assert len(sync_ticks) == 5
+    assert sync_ticks == async_ticks
+
+
+def test_run_inside_event_loop_fails_clearly(make_loop):
+    loop = make_loop()
+
+    async def call_sync_run():
+        loop.run(max_ticks=1)
+
+    with pytest.raises(RuntimeError, match="run_async"):
+        asyncio.run(call_sync_run())
+
+
+def test_dashboard_handlers_receive_ticks_in_order(make_loop):
+    loop = make_loop()
+    received = []
+
+    def slow_handler(snapshot):
+        time.sleep(0.002)
+        received.append(snapshot.tick)
+
+    loop.attach_dashboard(slow_handler)
+    snapshots = loop.run(max_ticks=20)
+    assert len(received) == 20
+    assert received == [snapshot.tick for snapshot in snapshots]
+
+
+def test_publish_back_pressure_blocks_the_loop(make_loop):
+    loop = make_loop()
+    release = threading.Event()
+    produced = []
+    published = []
+
+    def blocked_handler(snapshot):
+        release.wait(timeout=10)
+        published.append(snapshot.tick)
+
+    loop.attach_dashboard(blocked_handler)
+    runner = threading.Thread(target=loop.run, kwargs={"max_ticks": 30, "on_snapshot": lambda s: produced.append(s.tick)})
+    runner.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(produced) <= MAX_PENDING_PUBLISHES and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        # 配信中の 1 件 + 滞留上限まで進んだところで、最も古い配信の完了を待って止まる
+        assert len(produced) == MAX_PENDING_PUBLISHES + 1
+    finally:
+        release.set()
+        runner.join(timeout=10)
+    assert len(produced) == 30
+    assert published == produced
+
+
+def test_publish_errors_propagate_to_caller(make_loop):
+    loop = make_loop()
+    produced = []
+
+    def failing_handler(snapshot):
+        raise ValueError(f"boom at {snapshot.tick}")
+
+    loop.attach_dashboard(failing_handler)
+    with pytest.raises(ValueError) as excinfo:
+        loop.run(max_ticks=50, on_snapshot=lambda s: produced.append(s.tick))
+    # 最初に失敗した配信の例外が伝わり、ループはそこで止まる
+    assert str(excinfo.value) == f"boom at {produced[0]}"
+    assert len(produced) <= MAX_PENDING_PUBLISHES + 1
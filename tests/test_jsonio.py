@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+
+import pytest
+
+from yamada7.core import jsonio
+
+
+class Color(Enum):
+    RED = "red"
+
+
+SAMPLE = {
+    "text": "日本語",
+    "nested": {"list": [1, 2.5, None, True], "when": datetime(2024, 1, 2, 3, 4, 5)},
+    "color": Color.RED,
+    1: "int key",
+    2.5: "float key",
+    None: "none key",
+    datetime(2024, 1, 1): "datetime key",
+    Color.RED: "enum key",
+}
+EXPECTED = (
+    '{"text":"日本語","nested":{"list":[1,2.5,null,true],"when":"2024-01-02T03:04:05"},'
+    '"color":"red","1":"int key","2.5":"float key","null":"none key",'
+    '"2024-01-01T00:00:00":"datetime key","red":"enum key"}'
+)
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(jsonio, "orjson", None)
+    return request.param
+
+
+def test_dumps_is_compact_and_accepts_non_str_keys(backend):
+    assert jsonio.dumps(SAMPLE) == EXPECTED
+    assert jsonio.dumps_bytes(SAMPLE, newline=True) == (EXPECTED + "\n").encode("utf-8")
+
+
+def test_tuple_keys_are_rejected(backend):
+    with pytest.raises(TypeError):
+        jsonio.dumps({(1, 2): "tuple key"})
+
+
+def test_unsupported_values_are_rejected(backend):
+    with pytest.raises(TypeError):
+        jsonio.dumps({"value": object()})
+
+
+def test_loads_round_trip(backend):
+    assert jsonio.loads(jsonio.dumps({"a": [1, "b"]})) == {"a": [1, "b"]}
+    assert jsonio.loads(b'{"a": 1}') == {"a": 1}
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import atexit
+
+import pytest
+
+from yamada7.core.memory import MemoryManager
+from yamada7.core.models import Reflection
+
+
+def make_reflection(fear=(), curiosity=()) -> Reflection:
+    return Reflection(summary="", fear_updates=list(fear), curiosity_updates=list(curiosity), next_bias={})
+
+
+def test_update_appends_notes_and_flush_writes_them(tmp_path):
+    manager = MemoryManager(root=tmp_path)
+    try:
+        manager.update(make_reflection(fear=["a"], curiosity=["x"]))
+        manager.update(make_reflection(fear=["b", "c"]))
+        manager.flush()
+        assert (tmp_path / "alert.log").read_text(encoding="utf-8") == "a\nb\nc\n"
+        assert (tmp_path / "explore.log").read_text(encoding="utf-8") == "x\n"
+        assert manager.export() == {"alert": ["a", "b", "c"], "exploration": ["x"]}
+    finally:
+        manager.close()
+
+
+def test_first_update_truncates_logs_from_previous_run(tmp_path):
+    (tmp_path / "alert.log").write_text("stale alert\n", encoding="utf-8")
+    (tmp_path / "explore.log").write_text("stale explore\n", encoding="utf-8")
+
+    manager = MemoryManager(root=tmp_path)
+    try:
+        # explore.log には一度も書かないが、前回実行分は残さない
+        manager.update(make_reflection(fear=["fresh"]))
+        manager.flush()
+        assert (tmp_path / "alert.log").read_text(encoding="utf-8") == "fresh\n"
+        assert (tmp_path / "explore.log").read_text(encoding="utf-8") == ""
+    finally:
+        manager.close()
+
+
+def test_close_stops_writer_and_later_updates_append(tmp_path):
+    manager = MemoryManager(root=tmp_path)
+    manager.update(make_reflection(fear=["one"]))
+    thread = manager._writer_thread
+    assert thread is not None and thread.is_alive()
+
+    manager.close()
+    assert not thread.is_alive()
+    assert manager._writer_thread is None
+    assert (tmp_path / "alert.log").read_text(encoding="utf-8") == "one\n"
+    manager.close()  # 二度目の close は何もしない
+
+    manager.update(make_reflection(fear=["two"]))
+    manager.close()
+    assert (tmp_path / "alert.log").read_text(encoding="utf-8") == "one\ntwo\n"
+
+
+def test_close_is_registered_with_atexit_while_writer_runs(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    monkeypatch.setattr(atexit, "unregister", registered.remove)
+
+    manager = MemoryManager(root=tmp_path)
+    manager.close()  # 書き込みスレッドが無ければ何もしない
+    manager.update(make_reflection(curiosity=["note"]))
+    assert registered == [manager.close]
+    manager.close()
+    assert registered == []
+
+
+def test_write_errors_surface_instead_of_blocking(tmp_path):
+    (tmp_path / "alert.log").mkdir()
+    manager = MemoryManager(root=tmp_path)
+    manager.update(make_reflection(fear=["lost"]))
+    with pytest.raises(IsADirectoryError):
+        manager.flush()
+    manager.flush()  # 例外は一度だけ伝え、書き込みスレッドは動き続ける
+
+    manager.update(make_reflection(curiosity=["kept"]))
+    manager.flush()
+    assert (tmp_path / "explore.log").read_text(encoding="utf-8") == "kept\n"
+
+    manager.update(make_reflection(fear=["again"]))
+    with pytest.raises(IsADirectoryError):
+        manager.close()
+    assert manager._writer_thread is None
+
+
+def test_write_errors_are_raised_from_the_next_update(tmp_path):
+    (tmp_path / "alert.log").mkdir()
+    manager = MemoryManager(root=tmp_path)
+    try:
+        manager.update(make_reflection(fear=["lost"]))
+        manager._writer_queue.join()
+        with pytest.raises(IsADirectoryError):
+            manager.update(make_reflection(fear=["next"]))
+    finally:
+        manager.close()
@@ -53,3 +53,32 @@ def test_refine_archives_old_sections(tmp_path):
     assert stats["sections"] <= store.max_sections
     archive_files = list((tmp_path / "archive").glob("*.md"))
     assert archive_files, "refine should move old sections into archive"
+
+
+def test_context_survives_reload_and_retire(tmp_path):
+    store = make_store(tmp_path)
+    store.apply_deltas([PlaybookDelta(target="a", change_type="add", content="## a\n- one\n")], tick=1)
+    store.apply_deltas([PlaybookDelta(target="b", change_type="add", content="## b\n- two\n")], tick=2)
+    assert store.get_context()[0].startswith("## b")
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.stats()["files"] == 2
+    assert reloaded.contains(PlaybookDelta(target="a", change_type="add", content="## a\n- one"))
+
+    applied, _ = reloaded.apply_deltas([PlaybookDelta(target="b", change_type="retire", content="")], tick=3)
+    assert applied[0].status == "applied"
+    assert reloaded.get_context() == ["## a\n- one"]
+    assert not (tmp_path / "current" / "b.md").exists()
+
+
+def test_duplicate_detection_ignores_unicode_whitespace(tmp_path):
+    store = make_store(tmp_path)
+    store.apply_deltas([PlaybookDelta(target="alert_notes", change_type="add", content="## 注意\n- 危険")], tick=1)
+
+    padded = PlaybookDelta(target="alert_notes", change_type="add", content="　## 注意\n- 危険　\n")
+    assert store.contains(padded)
+    assert make_store(tmp_path).contains(padded)
+
+    applied, _ = store.apply_deltas([padded], tick=2)
+    assert applied[0].status == "skipped"
+    assert store.stats()["sections"] == 1
@@ -42,3 +42,11 @@ def test_parse_args_with_config(tmp_path):
     assert args.headless is True
     assert args.linger == 5
     assert args.tick_delay == 1.5
+
+
+def test_parser_defaults_match_parse_args():
+    parser = run_sim.build_parser()
+    expected = vars(parser.parse_args([]))
+    dests = ["ticks", "episodes", "tick_delay", "llm_mode", "claude_timeout", "ace_mode", "unknown_key"]
+    defaults = vars(run_sim.parser_defaults(parser, dests))
+    assert defaults == {dest: expected.get(dest) for dest in dests}